@@ -0,0 +1,101 @@
+import logging
+import queue
+import sys
+import threading
+from collections import deque
+
+# Destino de salida configurable para los mensajes de log y consola de los programas.
+# Los mensajes se pasan como plantilla + argumentos ('%s = %s', key, value) y solo se
+# formatean cuando realmente se van a escribir.
+
+CONSOLE = 'console'  # logging + print síncronos (comportamiento original)
+DISABLED = 'disabled'  # descarta los mensajes sin formatearlos
+BUFFERED = 'buffered'  # guarda los mensajes en memoria, se formatean al leerlos
+QUEUED = 'queued'  # un hilo en segundo plano escribe los mensajes sin bloquear al llamador
+
+MODES = (CONSOLE, DISABLED, BUFFERED, QUEUED)
+
+def _discard(msg, *args, console=True):
+    pass
+
+class OutputSink:
+    """
+    Destino de salida con cuatro modos: consola, deshabilitado, en memoria y en cola.
+    `console=False` indica que el mensaje solo va al log y no se imprime.
+    """
+    def __init__(self, mode=CONSOLE, use_logging=True, stream=None, capacity=10000):
+        if mode not in MODES:
+            raise ValueError(f'Unknown output mode: {mode}')
+        self.mode = mode
+        self.use_logging = use_logging  # Si es False solo se imprime en consola
+        self.stream = stream  # None usa sys.stdout en el momento de escribir
+        self.buffer = deque(maxlen=capacity)  # Registros pendientes del modo en memoria
+        self.dropped = 0  # Registros perdidos por llenarse el buffer
+        self._queue = None
+        self._writer = None
+        if mode == DISABLED:
+            self.info = self.warning = self.error = _discard
+        elif mode == QUEUED:
+            self._queue = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._drain, name='output-sink', daemon=True)
+            self._writer.start()
+
+    def emit(self, level, msg, *args, console=True):
+        """
+        Envía un mensaje al destino configurado.
+        """
+        if self.mode == CONSOLE:
+            self._write(level, msg, args, console)
+        elif self.mode == QUEUED:
+            self._queue.put((level, msg, args, console))
+        elif self.mode == BUFFERED:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append((level, msg, args, console))
+
+    def info(self, msg, *args, console=True):
+        self.emit(logging.INFO, msg, *args, console=console)
+
+    def warning(self, msg, *args, console=True):
+        self.emit(logging.WARNING, msg, *args, console=console)
+
+    def error(self, msg, *args, console=True):
+        self.emit(logging.ERROR, msg, *args, console=console)
+
+    def _write(self, level, msg, args, console):
+        if console:
+            text = msg % args if args else msg
+            if self.use_logging:
+                logging.log(level, text)
+            print(text, file=self.stream or sys.stdout)
+        elif self.use_logging:
+            logging.log(level, msg, *args)
+
+    def _drain(self):
+        """
+        Bucle del hilo escritor: vacía la cola en lotes hasta recibir None.
+        """
+        while True:
+            record = self._queue.get()
+            while record is not None:
+                self._write(*record)
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                return
+
+    def lines(self):
+        """
+        Formatea y devuelve los mensajes guardados en memoria.
+        """
+        return [msg % args if args else msg for _, msg, args, _ in self.buffer]
+
+    def close(self):
+        """
+        Espera a que el hilo escritor termine de vaciar la cola.
+        """
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
@@ -0,0 +1,21 @@
+import importlib.util
+
+# Utilidades compartidas por los programas y sus benchmarks.
+
+def load_module(path, name):
+    """
+    Carga un script como módulo a partir de su ruta (nombres como '2system_task.py' o
+    'events-mejorado.py' no son importables directamente).
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def percentile(ordered, fraction):
+    """
+    Valor en la fracción `fraction` (0.99 = p99) de una secuencia ya ordenada; 0.0 si está vacía.
+    """
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark de celdas mixtas (cálculo pesado + triviales) ejecutadas en el hilo del bucle de eventos
+# frente al pool de procesos trabajadores. Mide el tiempo total, la latencia de las celdas triviales
+# (desde que se envía el lote) y el mayor bloqueo observado del bucle de eventos.
+
+HEAVY = "h{i} = sum(k * k for k in range(1_500_000))"
+TRIVIAL = "t{i} = {i} + 1"
+
+async def heartbeat(stop, stalls):
+    """
+    Registra cuánto se retrasa el bucle de eventos respecto de un tic de 1 ms.
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        stalls.append(time.perf_counter() - start - 0.001)
+
+async def run(module, workers, num_heavy, num_trivial):
+    notebook = module.Notebook(parallel=True, process_workers=workers,
+                               output=module.OutputSink('disabled'))
+    trivial_latency = []
+
+    async def timed(cell, latencies):
+        await notebook.execute_cell(cell)
+        if latencies is not None:
+            latencies.append(time.perf_counter() - start)
+
+    stop, stalls = asyncio.Event(), []
+    beat = asyncio.ensure_future(heartbeat(stop, stalls))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    # Las celdas se intercalan: una pesada seguida de varias triviales
+    jobs = []
+    per_heavy = num_trivial // num_heavy
+    for i in range(num_heavy):
+        jobs.append(timed(HEAVY.format(i=i), None))
+        jobs += [timed(TRIVIAL.format(i=i * per_heavy + j), trivial_latency) for j in range(per_heavy)]
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    notebook.close()
+    return elapsed, statistics.median(trivial_latency), max(stalls)
+
+def main():
+    logging.disable(logging.CRITICAL)
+    module = load_module(Path(__file__).with_name('events-mejorado.py'), 'events_mejorado')
+    print(f"cpu_count={os.cpu_count()}")
+    for label, workers in (('in-process', 0), ('2 workers', 2), ('4 workers', 4)):
+        elapsed, trivial, stall = asyncio.run(run(module, workers, num_heavy=8, num_trivial=48))
+        print(f"{label:<12} total={elapsed:7.3f} s  trivial p50={trivial * 1000:9.2f} ms  "
+              f"max loop stall={stall * 1000:9.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark del costo de checkpoint y del tiempo de restauración según el tamaño del notebook.
+# Compara restaurar desde el último checkpoint (+100 eventos) contra reproducir todos los eventos.
+
+def build_log(module, path, num_vars, num_cells, checkpoint):
+    """
+    Crea un registro con `num_vars` actualizaciones de estado y `num_cells` celdas ejecutadas,
+    opcionalmente un checkpoint, y 100 eventos más después de él.
+    """
+    sink = module.OutputSink('disabled')
+    notebook = module.Notebook(checkpoint_path=path, output=sink)
+    events = [module.Event(1, 'update_state', (f'v{i}', list(range(10)))) for i in range(num_vars)]
+    events += [module.Event(2, 'execute_cell', f'c{i} = len(v{i % num_vars}) + {i}') for i in range(num_cells)]
+    for start in range(0, len(events), 1000):
+        notebook.journal.append_events([(e.event_type, e.data) for e in events[start:start + 1000]])
+        for event in events[start:start + 1000]:
+            if event.event_type == 'update_state':
+                notebook.update_state(*event.data)
+            else:
+                notebook.run_cell(event.data)
+    cost = size = 0
+    if checkpoint:
+        start = time.perf_counter()
+        size = notebook.checkpoint()
+        cost = time.perf_counter() - start
+    tail = [('update_state', (f'v{i}', i)) for i in range(100)]
+    notebook.journal.append_events(tail)
+    for _, data in tail:
+        notebook.update_state(*data)
+    notebook.close()
+    return cost, size
+
+def timed_restore(module, path):
+    start = time.perf_counter()
+    notebook = module.Notebook.restore(path, output=module.OutputSink('disabled'))
+    elapsed = time.perf_counter() - start
+    notebook.close()
+    return elapsed
+
+def main():
+    logging.disable(logging.CRITICAL)
+    module = load_module(Path(__file__).with_name('events-mejorado.py'), 'events_mejorado')
+    print(f"{'vars':>7} {'cells':>6} {'ckpt ms':>9} {'ckpt KiB':>9} {'restore ms':>11} {'replay ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_vars, num_cells in ((1_000, 100), (10_000, 1_000), (100_000, 10_000)):
+            with_ckpt = os.path.join(tmp, f'ckpt-{num_vars}.log')
+            without = os.path.join(tmp, f'replay-{num_vars}.log')
+            cost, size = build_log(module, with_ckpt, num_vars, num_cells, checkpoint=True)
+            build_log(module, without, num_vars, num_cells, checkpoint=False)
+            restore = timed_restore(module, with_ckpt)
+            replay = timed_restore(module, without)
+            print(f"{num_vars:7d} {num_cells:6d} {cost * 1000:9.1f} {size / 1024:9.1f} "
+                  f"{restore * 1000:11.1f} {replay * 1000:10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import asyncio
+import contextlib
+import io
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module, percentile
+
+# Benchmark de latencia (encolado -> ejecución) y rendimiento del bucle de eventos.
+# "antes" usa prg1/1events.py (sondeo cada 100 ms) y "después" usa prg1/events-mejorado.py.
+
+def make_notebook(module, latencies, total, done):
+    """
+    Crea un Notebook cuyo manejador registra la latencia de cada evento.
+    """
+    class BenchNotebook(module.Notebook):
+        async def handle_event(self, event):
+            latencies.append(time.perf_counter() - event.data)
+            if len(latencies) == total:
+                done.set()
+    return BenchNotebook()
+
+async def run_scenario(module, total, spacing, threaded):
+    """
+    Encola `total` eventos separados por `spacing` segundos y mide latencias y eventos/seg.
+    """
+    latencies = []
+    done = asyncio.Event()
+    notebook = make_notebook(module, latencies, total, done)
+    loop_task = asyncio.create_task(notebook.event_loop())
+    await asyncio.sleep(0)
+
+    def produce():
+        for _ in range(total):
+            notebook.add_event(module.Event(priority=1, event_type='bench', data=time.perf_counter()))
+            if spacing:
+                time.sleep(spacing)
+
+    start = time.perf_counter()
+    if threaded:
+        producer = threading.Thread(target=produce)
+        producer.start()
+    else:
+        for _ in range(total):
+            notebook.add_event(module.Event(priority=1, event_type='bench', data=time.perf_counter()))
+            if spacing:
+                await asyncio.sleep(spacing)
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    if threaded:
+        producer.join()
+    loop_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await loop_task
+    latencies.sort()
+    return {
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'events_per_sec': total / elapsed,
+    }
+
+def report(label, result):
+    print(f"{label:<32} p50={result['p50_ms']:9.3f} ms  p99={result['p99_ms']:9.3f} ms  "
+          f"{result['events_per_sec']:12.1f} events/s")
+
+def main():
+    logging.disable(logging.CRITICAL)
+    before = load_module(Path(__file__).with_name('1events.py'), 'events_before')
+    after = load_module(Path(__file__).with_name('events-mejorado.py'), 'events_after')
+    scenarios = [
+        # (etiqueta, módulo, eventos, espaciado, productor en otro hilo)
+        ('before: burst', before, 30, 0, False),
+        ('before: spaced 5 ms', before, 20, 0.005, False),
+        ('after: burst', after, 20000, 0, False),
+        ('after: spaced 5 ms', after, 200, 0.005, False),
+        ('after: thread producer 1 ms', after, 500, 0.001, True),
+    ]
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for label, module, total, spacing, threaded in scenarios:
+            results.append((label, asyncio.run(run_scenario(module, total, spacing, threaded))))
+    for label, result in results:
+        report(label, result)
+
+if __name__ == '__main__':
+    main()
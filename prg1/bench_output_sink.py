@@ -0,0 +1,43 @@
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+import output_sink
+from perf_utils import load_module
+
+# Benchmark de rendimiento de eventos del Notebook según el modo de salida.
+# La salida de consola y de logging se escribe en un archivo temporal real (E/S bloqueante).
+
+async def run_events(module, sink, num_events):
+    notebook = module.Notebook(output=sink)
+    notebook.compiled_cells.get('y = x + 1')
+    start = time.perf_counter()
+    for i in range(num_events):
+        if i % 2:
+            notebook.add_event(module.Event(priority=1, event_type='update_state', data=('x', i)))
+        else:
+            notebook.add_event(module.Event(priority=2, event_type='execute_cell', data='y = x + 1'))
+        if i % 100 == 99:
+            await notebook.process_batch(notebook.event_queue.drain())
+    await notebook.process_batch(notebook.event_queue.drain())
+    elapsed = time.perf_counter() - start
+    sink.close()
+    return elapsed
+
+def main():
+    num_events = 20000
+    with tempfile.TemporaryFile('w') as console:
+        module = load_module(Path(__file__).with_name('events-mejorado.py'), 'events_mejorado')
+        for handler in logging.getLogger().handlers:
+            handler.setStream(console)
+        for mode in output_sink.MODES:
+            sink = output_sink.OutputSink(mode, stream=console)
+            elapsed = asyncio.run(run_events(module, sink, num_events))
+            print(f"{mode:<10} {num_events / elapsed:10.1f} events/s")
+
+if __name__ == '__main__':
+    main()
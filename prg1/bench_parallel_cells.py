@@ -0,0 +1,50 @@
+import asyncio
+import contextlib
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark de rendimiento de la ejecución paralela de celdas independientes.
+# Compara Notebook(parallel=False) contra Notebook(parallel=True) procesando un lote de celdas.
+
+WORKLOADS = {
+    # Celdas que liberan el GIL (E/S simulada con sleep)
+    'io-bound': "import time\ntime.sleep(0.002)\nv{i} = {i}",
+    # Celdas de cálculo puro en Python (limitadas por el GIL en un pool de hilos)
+    'cpu-bound': "v{i} = sum(k * k for k in range(2000))",
+    # Celdas en cadena: cada una lee la anterior, así que no hay paralelismo posible
+    'chained': "v{i} = v{prev} + 1",
+}
+
+async def run_batch(module, parallel, cells):
+    notebook = module.Notebook(parallel=parallel, max_workers=32)
+    notebook.state['v0'] = 0
+    events = [module.Event(priority=1, event_type='execute_cell', data=cell) for cell in cells]
+    for event in events:
+        notebook.event_access(event)  # Precompila y analiza para medir solo la ejecución
+    start = time.perf_counter()
+    await notebook.process_batch(events)
+    elapsed = time.perf_counter() - start
+    if notebook.executor is not None:
+        notebook.executor.shutdown()
+    return elapsed
+
+def main():
+    logging.disable(logging.CRITICAL)
+    module = load_module(Path(__file__).with_name('events-mejorado.py'), 'events_mejorado')
+    for num_cells in (200, 500):
+        for name, template in WORKLOADS.items():
+            cells = [template.format(i=i, prev=max(i - 1, 0)) for i in range(num_cells)]
+            with contextlib.redirect_stdout(io.StringIO()):
+                serial = asyncio.run(run_batch(module, False, cells))
+                parallel = asyncio.run(run_batch(module, True, cells))
+            print(f"{num_cells:4d} cells {name:<10} serial={num_cells / serial:9.1f} cells/s  "
+                  f"parallel={num_cells / parallel:9.1f} cells/s  speedup={serial / parallel:5.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+import asyncio
+import functools
+import itertools
+import multiprocessing
+import os
+import pickle
+import threading
+from collections import deque
+
+# Pool de procesos "calientes" para ejecutar celdas del notebook fuera del hilo del bucle de eventos.
+# Cada proceso mantiene su propia copia del estado; el proceso padre le envía solo las variables
+# que cambiaron desde su última tarea y recibe de vuelta solo las variables que la celda modificó,
+# serializadas con pickle por variable. Los nombres que no se pueden serializar (módulos importados,
+# funciones definidas en una celda) se propagan reejecutando la celda que los enlazó en los demás
+# trabajadores antes de su próxima tarea.
+
+_PROTOCOL = pickle.HIGHEST_PROTOCOL
+_SKIP = {'__builtins__'}
+_MISSING = object()
+
+class WorkerExitedError(RuntimeError):
+    """
+    El proceso trabajador terminó mientras ejecutaba la celda (os._exit, señal, falta de memoria).
+    """
+
+@functools.lru_cache(maxsize=256)
+def _compile(source):
+    return compile(source, '<cell>', 'exec')
+
+def _dump(value):
+    """
+    Serializa un valor; retorna None si no es serializable (módulos, funciones locales, etc.).
+    """
+    try:
+        return pickle.dumps(value, _PROTOCOL)
+    except Exception:
+        return None
+
+def worker_main(conn):
+    """
+    Bucle de un proceso trabajador: aplica la sincronización recibida, ejecuta la celda
+    y responde con el delta de estado (variables nuevas, reasignadas, mutadas o borradas).
+    """
+    namespace = {}
+    while True:
+        try:
+            task = pickle.loads(conn.recv_bytes())
+        except EOFError:
+            return
+        if task is None:
+            return
+        task_id, source, replay, sync, deleted, tracked = task
+        for replay_source, names in replay:
+            _replay(namespace, replay_source, names)
+        for name, blob in sync.items():
+            namespace[name] = pickle.loads(blob)
+        for name in deleted:
+            namespace.pop(name, None)
+        before = dict(namespace)
+        error = None
+        try:
+            exec(_compile(source), namespace)
+        except BaseException as e:  # sys.exit en una celda también vuelve como error
+            error = f'{type(e).__name__}: {e}'
+        changed = {name for name, value in namespace.items() if before.get(name, _MISSING) is not value}
+        changed.update(name for name in tracked if name in namespace)
+        delta, unpicklable = {}, []
+        for name in changed - _SKIP:
+            blob = _dump(namespace[name])
+            if blob is not None:
+                delta[name] = blob
+            else:
+                unpicklable.append(name)
+        removed = [name for name in before if name not in namespace]
+        conn.send_bytes(pickle.dumps((task_id, delta, removed, unpicklable, error), _PROTOCOL))
+
+def _replay(namespace, source, names):
+    """
+    Reejecuta una celda de otro trabajador para enlazar aquí `names` (valores no serializables).
+    Cualquier otro nombre que la celda toque vuelve a su valor anterior: este trabajador ya lo
+    tiene al día o lo recibirá en la sincronización que sigue.
+    """
+    before = dict(namespace)
+    try:
+        exec(_compile(source), namespace)
+    except BaseException:
+        pass
+    for name in list(namespace):
+        if name in names or name in _SKIP:
+            continue
+        if name not in before:
+            del namespace[name]
+        elif namespace[name] is not before[name]:
+            namespace[name] = before[name]
+    for name, value in before.items():
+        if name not in namespace and name not in names:
+            namespace[name] = value
+
+class _Worker:
+    def __init__(self, process, conn, dirty):
+        self.process = process
+        self.conn = conn
+        self.dirty = dirty  # Variables que este trabajador aún no tiene actualizadas
+        self.replay = []  # Celdas (fuente, nombres) que debe reejecutar antes de su próxima tarea
+        self.task = None  # (task_id, future, timeout) en ejecución
+        self.timer = None  # Temporizador de timeout de la tarea actual
+
+class CellProcessPool:
+    """
+    Ejecuta celdas en procesos trabajadores precalentados y devuelve futuros de asyncio.
+    Soporta timeout por celda y cancelación (ambos reinician el trabajador afectado).
+    """
+    def __init__(self, state, num_workers=None, timeout=None, start_method=None):
+        self.state = state  # Estado autoritativo del notebook (se modifica en sitio)
+        self.timeout = timeout  # Timeout por defecto de cada celda, en segundos
+        self._ctx = multiprocessing.get_context(start_method)
+        self._loop = None
+        self._ids = itertools.count()
+        self._blobs = {}  # Variable -> pickle vigente, para no serializar dos veces
+        self._replay_log = []  # (fuente, nombres) de las celdas que enlazaron valores no serializables
+        self._replayed = set()  # Nombres cuyo valor vigente solo existe reejecutando su celda
+        self._pending = deque()  # Tareas esperando un trabajador libre
+        self._idle = deque()
+        self.workers = []
+        self.stats = {'submitted': 0, 'completed': 0, 'timeouts': 0, 'cancelled': 0,
+                      'restarts': 0, 'bytes_sent': 0, 'bytes_received': 0}
+        for _ in range(num_workers or os.cpu_count() or 1):
+            worker = self._spawn()
+            self.workers.append(worker)
+            self._idle.append(worker)
+
+    def _spawn(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=worker_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn, set(self.state) - _SKIP)
+        worker.replay = list(self._replay_log)
+        threading.Thread(target=self._reader, args=(worker,), daemon=True).start()
+        return worker
+
+    def _reader(self, worker):
+        """
+        Hilo lector: entrega cada respuesta del trabajador al bucle de eventos y avisa si
+        el proceso terminó.
+        """
+        while True:
+            try:
+                payload = worker.conn.recv_bytes()
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._on_result, worker, payload)
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._on_exit, worker)
+            except RuntimeError:
+                pass  # El bucle ya se cerró
+
+    def mark_dirty(self, names, source=None):
+        """
+        Indica que estas variables cambiaron en el estado del padre; se reenviarán a
+        todos los trabajadores (salvo `source`) antes de su próxima tarea.
+        """
+        for name in names:
+            self._blobs.pop(name, None)
+        for worker in self.workers:
+            if worker is not source:
+                worker.dirty.update(names)
+
+    def submit(self, source, tracked=(), timeout=None):
+        """
+        Encola una celda y retorna un futuro que se resuelve con None o con el mensaje de error.
+        Debe llamarse desde el bucle de eventos.
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        future = self._loop.create_future()
+        task = (next(self._ids), source, tuple(tracked), future, timeout or self.timeout)
+        future.add_done_callback(functools.partial(self._on_done, task))
+        self.stats['submitted'] += 1
+        self._pending.append(task)
+        self._dispatch()
+        return future
+
+    def _dispatch(self):
+        while self._pending and self._idle:
+            task_id, source, tracked, future, timeout = self._pending.popleft()
+            if future.done():
+                continue
+            worker = self._idle.popleft()
+            sync, deleted = {}, []
+            for name in worker.dirty:
+                if name not in self.state:
+                    if name not in self._replayed:
+                        deleted.append(name)
+                    continue
+                blob = self._blobs.get(name)
+                if blob is None:
+                    blob = _dump(self.state[name])
+                    if blob is None:
+                        continue
+                    self._blobs[name] = blob
+                sync[name] = blob
+            # Solo hace falta reejecutar las celdas que aún enlazan algún nombre vigente
+            replay = [entry for entry in worker.replay if not self._replayed.isdisjoint(entry[1])]
+            worker.dirty, worker.replay = set(), []
+            payload = pickle.dumps((task_id, source, replay, sync, deleted, tracked), _PROTOCOL)
+            self.stats['bytes_sent'] += len(payload)
+            worker.task = (task_id, future, timeout, source)
+            worker.conn.send_bytes(payload)
+            if timeout:
+                worker.timer = self._loop.call_later(timeout, self._on_timeout, worker, task_id)
+
+    def _on_result(self, worker, payload):
+        task_id, delta, removed, unpicklable, error = pickle.loads(payload)
+        if worker.task is None or worker.task[0] != task_id:
+            return  # Respuesta de una tarea ya cancelada
+        self.stats['bytes_received'] += len(payload)
+        future, source = worker.task[1], worker.task[3]
+        self._release(worker)
+        for name, blob in delta.items():
+            self.state[name] = pickle.loads(blob)
+        for name in removed:
+            self.state.pop(name, None)
+        if not self._replayed.isdisjoint(delta) or not self._replayed.isdisjoint(removed):
+            self._replayed.difference_update(delta)
+            self._replayed.difference_update(removed)
+            self._replay_log = [entry for entry in self._replay_log if not self._replayed.isdisjoint(entry[1])]
+        if unpicklable:
+            # El valor anterior (si era serializable) ya no es el vigente
+            for name in unpicklable:
+                self.state.pop(name, None)
+                self._blobs.pop(name, None)
+            self._replayed.update(unpicklable)
+            entry = (source, tuple(unpicklable))
+            self._replay_log.append(entry)
+            for other in self.workers:
+                if other is not worker:
+                    other.replay.append(entry)
+        self.mark_dirty(list(delta) + removed, source=worker)
+        self._blobs.update(delta)
+        self.stats['completed'] += 1
+        if not future.done():
+            future.set_result(error)
+        self._dispatch()
+
+    def _release(self, worker):
+        if worker.timer is not None:
+            worker.timer.cancel()
+            worker.timer = None
+        worker.task = None
+        self._idle.append(worker)
+
+    def _on_timeout(self, worker, task_id):
+        if worker.task is not None and worker.task[0] == task_id:
+            _, future, timeout, _ = worker.task
+            self.stats['timeouts'] += 1
+            self._restart(worker)
+            future.set_exception(asyncio.TimeoutError(f'Cell exceeded {timeout}s timeout'))
+
+    def _on_exit(self, worker):
+        """
+        El proceso del trabajador terminó por su cuenta: falla la tarea en curso y lo reemplaza.
+        """
+        if worker not in self.workers:
+            return  # Ya se reinició (timeout, cancelación) o el pool se cerró
+        task = worker.task
+        if task is None:
+            self._idle.remove(worker)
+        self._restart(worker)
+        if task is not None and not task[1].done():
+            task[1].set_exception(WorkerExitedError(
+                f'Worker process exited with code {worker.process.exitcode}'))
+
+    def _on_done(self, task, future):
+        if not future.cancelled():
+            return
+        self.stats['cancelled'] += 1
+        for worker in self.workers:
+            if worker.task is not None and worker.task[0] == task[0]:
+                self._restart(worker)
+
+    def _restart(self, worker):
+        """
+        Termina un trabajador ocupado y lo reemplaza por uno nuevo con el estado completo.
+        """
+        worker.process.terminate()
+        worker.process.join()
+        worker.conn.close()
+        if worker.timer is not None:
+            worker.timer.cancel()
+        self.stats['restarts'] += 1
+        replacement = self._spawn()
+        self.workers[self.workers.index(worker)] = replacement
+        self._idle.append(replacement)
+        self._loop.call_soon(self._dispatch)
+
+    def close(self):
+        """
+        Detiene todos los trabajadores.
+        """
+        for worker in self.workers:
+            try:
+                worker.conn.send_bytes(pickle.dumps(None))
+            except OSError:
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+        self.workers = []
+        self._idle.clear()
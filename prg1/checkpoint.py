@@ -0,0 +1,172 @@
+import mmap
+import os
+import pickle
+import struct
+
+# Registro de solo-anexado con instantáneas (checkpoints) del notebook y los eventos posteriores.
+# Cada registro tiene la forma [tipo:1][largo:4][payload][largo:4]; el largo repetido al final
+# permite recorrer el archivo hacia atrás desde el final hasta el último checkpoint sin leer
+# los registros anteriores.
+
+CHECKPOINT = b'C'
+EVENT = b'E'
+
+_HEADER = struct.Struct('<cI')
+_TRAILER = struct.Struct('<I')
+_PROTOCOL = pickle.HIGHEST_PROTOCOL
+_SKIP = {'__builtins__'}
+
+def picklable_state(state):
+    """
+    Serializa, variable por variable, las partes del estado que pickle puede guardar.
+    """
+    blobs = {}
+    for name, value in state.items():
+        if name in _SKIP:
+            continue
+        try:
+            blobs[name] = pickle.dumps(value, _PROTOCOL)
+        except Exception:
+            continue
+    return blobs
+
+class CheckpointLog:
+    """
+    Archivo de solo-anexado con checkpoints y eventos. La lectura se hace con mmap.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._truncate_torn_tail()
+        self._file = open(path, 'ab')
+        self.events_since_checkpoint = 0
+        self.skipped = 0  # Eventos no registrados por no ser serializables
+
+    def _truncate_torn_tail(self):
+        """
+        Si una escritura anterior quedó a medias, recorta el archivo al último registro completo.
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, 'r+b') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                try:
+                    next(_records_backwards(view))
+                    return
+                except ValueError:
+                    good_end = 0
+                    for _, offset, length in _records_forward(view):
+                        good_end = offset + length + _TRAILER.size
+            f.truncate(good_end)
+
+    def _append(self, kind, payload):
+        record = _HEADER.pack(kind, len(payload)) + payload + _TRAILER.pack(len(payload))
+        self._file.write(record)
+        return len(record)
+
+    def append_events(self, records):
+        """
+        Anexa registros de evento (tipo_evento, datos) y los escribe al disco en una sola llamada.
+        Los registros que pickle no puede serializar se omiten (igual que en picklable_state) y
+        se retornan para que el llamador los reporte; nunca se lanza la excepción.
+        """
+        skipped = []
+        for record in records:
+            try:
+                payload = pickle.dumps(record, _PROTOCOL)
+            except Exception:
+                skipped.append(record)
+                continue
+            self._append(EVENT, payload)
+            self.events_since_checkpoint += 1
+        self._file.flush()
+        self.skipped += len(skipped)
+        return skipped
+
+    def write_checkpoint(self, state, cells):
+        """
+        Anexa una instantánea de las partes serializables del estado y de las celdas.
+        Retorna el número de bytes escritos.
+        """
+        payload = pickle.dumps({'state': picklable_state(state), 'cells': list(cells)}, _PROTOCOL)
+        written = self._append(CHECKPOINT, payload)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.events_since_checkpoint = 0
+        return written
+
+    def close(self):
+        self._file.close()
+
+def _records_backwards(view):
+    """
+    Recorre los registros desde el final. Lanza ValueError si encuentra un registro incompleto.
+    """
+    end = len(view)
+    while end > 0:
+        if end < _HEADER.size + _TRAILER.size:
+            raise ValueError('Corrupt checkpoint log')
+        (length,) = _TRAILER.unpack_from(view, end - _TRAILER.size)
+        start = end - _TRAILER.size - length - _HEADER.size
+        if start < 0:
+            raise ValueError('Corrupt checkpoint log')
+        kind, header_length = _HEADER.unpack_from(view, start)
+        if header_length != length:
+            raise ValueError('Corrupt checkpoint log')
+        yield kind, start + _HEADER.size, length
+        end = start
+
+def _records_forward(view):
+    """
+    Recorre los registros desde el inicio y descarta una cola incompleta (escritura interrumpida).
+    """
+    offset = 0
+    while offset + _HEADER.size <= len(view):
+        kind, length = _HEADER.unpack_from(view, offset)
+        end = offset + _HEADER.size + length + _TRAILER.size
+        if end > len(view) or _TRAILER.unpack_from(view, end - _TRAILER.size)[0] != length:
+            return
+        yield kind, offset + _HEADER.size, length
+        offset = end
+
+def _last_checkpoint(view):
+    """
+    Ubica el último checkpoint recorriendo hacia atrás solo los eventos posteriores a él.
+    Retorna ((offset, largo) o None, registros posteriores en orden).
+    """
+    try:
+        tail = []
+        for kind, offset, length in _records_backwards(view):
+            if kind == CHECKPOINT:
+                tail.reverse()
+                return (offset, length), tail
+            tail.append((kind, offset, length))
+        tail.reverse()
+        return None, tail
+    except ValueError:
+        checkpoint, tail = None, []
+        for kind, offset, length in _records_forward(view):
+            if kind == CHECKPOINT:
+                checkpoint, tail = (offset, length), []
+            else:
+                tail.append((kind, offset, length))
+        return checkpoint, tail
+
+def load_latest(path):
+    """
+    Lee el último checkpoint y los eventos registrados después de él.
+    Retorna (estado, celdas, eventos); estado y celdas son None si no hay checkpoint.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None, None, []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            checkpoint, tail = _last_checkpoint(view)
+            state = cells = None
+            if checkpoint is not None:
+                offset, length = checkpoint
+                snapshot = pickle.loads(view[offset:offset + length])
+                state = {name: pickle.loads(blob) for name, blob in snapshot['state'].items()}
+                cells = snapshot['cells']
+            events = [pickle.loads(view[offset:offset + length]) for kind, offset, length in tail
+                      if kind == EVENT]
+    return state, cells, events
@@ -1,111 +1,736 @@
-import asyncio
-import logging
-from queue import PriorityQueue
-import threading
-
-# Configuración del registro de logs
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-# Constructor de eventos
-class Event:
-    def __init__(self, priority, event_type, data):
-        self.priority = priority
-        self.event_type = event_type
-        self.data = data
-
-    def __lt__(self, other):
-        return self.priority < other.priority
-
-# Simulación del cuaderno de notebook
-class Notebook:
-    def __init__(self):
-        self.cells = []  # Lista de celdas de código
-        self.event_queue = PriorityQueue()  # Cola de eventos con prioridad
-        self.state = {}  # Estado compartido para la ejecución de celdas
-        self.lock = threading.Lock()  # Bloqueo para asegurar operaciones seguras en concurrencia
-
-    def add_cell(self, cell):
-        """
-        Agrega una nueva celda de código al notebook.
-        """
-        with self.lock:
-            self.cells.append(cell)
-        logging.info(f'Cell added: {cell}')
-
-    def update_state(self, key, value):
-        """
-        Actualiza el estado compartido con una nueva clave y valor.
-        """
-        with self.lock:
-            self.state[key] = value
-        logging.info(f'State updated: {key} = {value}')
-        print(f'State updated: {key} = {value}')  # Output para la consola
-
-    async def execute_cell(self, cell):
-        """
-        Ejecuta una celda de código en el estado compartido.
-        """
-        try:
-            exec(cell, self.state)
-            logging.info(f'Executed cell: {cell}')
-            print(f'Executed cell: {cell}')  # Output para la consola
-        except Exception as e:
-            logging.error(f'Error executing cell: {cell}, Error: {e}')
-            print(f'Error executing cell: {cell}, Error: {e}')  # Output para la consola
-
-    async def handle_event(self, event):
-        """
-        Maneja los eventos según su tipo.
-        """
-        if event.event_type == 'execute_cell':
-            await self.execute_cell(event.data)
-        elif event.event_type == 'update_state':
-            self.update_state(*event.data)
-        else:
-            logging.warning(f'Unknown event type: {event.event_type}')
-            print(f'Unknown event type: {event.event_type}')  # Output para la consola
-
-    async def event_loop(self):
-        """
-        Bucle principal de eventos que maneja y procesa eventos de la cola.
-        """
-        while True:
-            if not self.event_queue.empty():
-                event = self.event_queue.get()
-                await self.handle_event(event)
-            await asyncio.sleep(0.1)
-
-    def add_event(self, event):
-        """
-        Agrega un nuevo evento a la cola de eventos.
-        """
-        self.event_queue.put(event)
-        logging.info(f'Event added: {event.event_type} with priority {event.priority}')
-        print(f'Event added: {event.event_type} with priority {event.priority}')  # Output para la consola
-
-# Simulación de interacciones de usuario
-async def user_interactions(notebook):
-    """
-    Simula interacciones del usuario con el notebook.
-    """
-    notebook.add_event(Event(priority=1, event_type='update_state', data=('var1', 10)))
-    notebook.add_event(Event(priority=2, event_type='execute_cell', data="print('Hello, world!')"))
-    notebook.add_event(Event(priority=1, event_type='execute_cell', data="print(var1)"))
-
-# Ejecución del sistema
-async def main():
-    """
-    Función principal para iniciar el sistema de notebook y las interacciones del usuario.
-    """
-    notebook = Notebook()
-    await asyncio.gather(
-        notebook.event_loop(),
-        user_interactions(notebook)
-    )
-
-if __name__ == '__main__':
-    try:
-        asyncio.run(main())
-    except KeyboardInterrupt:
-        logging.info('Shutting down the event loop.')
-        print('Shutting down the event loop.')  # Output para la consola
+import asyncio
+import dis
+import functools
+import hashlib
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict, defaultdict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Módulos auxiliares: los de esta carpeta y output_sink.py en la raíz del repositorio
+sys.path.extend([str(Path(__file__).resolve().parent), str(Path(__file__).resolve().parent.parent)])
+from output_sink import OutputSink
+from cell_pool import CellProcessPool, WorkerExitedError
+from checkpoint import CheckpointLog, load_latest
+from perf_utils import percentile
+
+# Configuración del registro de logs
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Constructor de eventos
+class Event:
+    def __init__(self, priority, event_type, data):
+        self.priority = priority
+        self.event_type = event_type
+        self.data = data
+
+    def __lt__(self, other):
+        return self.priority < other.priority
+
+# Planificador de prioridad nativo de asyncio
+class AsyncPriorityScheduler:
+    """
+    Cola de prioridad que despierta al bucle de eventos en cuanto se agrega un evento,
+    tanto desde una corrutina como desde otro hilo, sin sondeo periódico.
+    """
+    def __init__(self, coalesce_updates=False):
+        self._heap = []  # Montículo de eventos pendientes
+        self._lock = threading.Lock()  # Protege el montículo frente a productores en otros hilos
+        self._loop = None  # Bucle de asyncio que consume los eventos
+        self._loop_thread = None  # Identificador del hilo del bucle
+        self._wakeup = None  # asyncio.Event que se activa al llegar eventos
+        self.coalesce_updates = coalesce_updates  # Solo aplica el último update_state por clave
+        self.enqueued = 0  # Eventos recibidos
+        self.coalesced = 0  # Eventos update_state descartados por uno posterior de la misma clave
+        self._seq = itertools.count()  # Desempate FIFO entre eventos de igual prioridad
+        self._waits = defaultdict(lambda: deque(maxlen=10000))  # tipo -> esperas recientes (s)
+        self._wait_totals = defaultdict(lambda: [0, 0.0, 0.0])  # tipo -> [cantidad, suma, máximo]
+
+    def bind(self, loop):
+        """
+        Asocia el planificador al bucle de asyncio que consumirá los eventos.
+        """
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._wakeup = asyncio.Event()
+        if not self.empty():
+            self._wakeup.set()
+
+    def put(self, event):
+        """
+        Agrega un evento y despierta al consumidor. Es seguro llamarlo desde cualquier hilo.
+        """
+        with self._lock:
+            self._push(event)
+        self._notify()
+
+    def put_many(self, events):
+        """
+        Agrega varios eventos tomando el bloqueo una sola vez y despierta al consumidor.
+        Retorna el número de eventos agregados.
+        """
+        events = list(events)
+        if not events:
+            return 0
+        with self._lock:
+            for event in events:
+                self._push(event)
+        self._notify()
+        return len(events)
+
+    def _push(self, event):
+        # Se llama con self._lock tomado
+        self.enqueued += 1
+        heapq.heappush(self._heap, (event.priority, next(self._seq), time.monotonic(), event))
+
+    def _coalesce(self, entries):
+        """
+        Recibe un lote de (llegada, evento) ya en orden de despacho y quita cada update_state que
+        otro posterior de la misma clave reemplaza sin ningún otro evento entre ambos. Cualquier
+        otro evento (p. ej. una celda) puede leer el estado, así que corta la fusión.
+        """
+        latest = {}  # clave -> posición del último update_state desde el último posible lector
+        dropped = set()
+        for position, (_, event) in enumerate(entries):
+            if event.event_type != 'update_state':
+                latest.clear()
+                continue
+            previous = latest.get(event.data[0])
+            if previous is not None:
+                dropped.add(previous)
+            latest[event.data[0]] = position
+        if not dropped:
+            return entries
+        self.coalesced += len(dropped)
+        return [entry for position, entry in enumerate(entries) if position not in dropped]
+
+    def _record_wait(self, event_type, wait):
+        self._waits[event_type].append(wait)
+        totals = self._wait_totals[event_type]
+        totals[0] += 1
+        totals[1] += wait
+        totals[2] = max(totals[2], wait)
+
+    def wait_stats(self):
+        """
+        Tiempo de espera en cola por tipo de evento, en milisegundos.
+        Los percentiles se calculan sobre las últimas 10000 esperas de cada tipo.
+        """
+        stats = {}
+        for event_type, (count, total, longest) in self._wait_totals.items():
+            recent = sorted(self._waits[event_type])
+            stats[event_type] = {
+                'count': count,
+                'mean_ms': total / count * 1000,
+                'p50_ms': percentile(recent, 0.5) * 1000,
+                'p99_ms': percentile(recent, 0.99) * 1000,
+                'max_ms': longest * 1000,
+            }
+        return stats
+
+    def _notify(self):
+        if self._wakeup is None:
+            return  # El bucle aún no arranca; drenará los eventos al iniciar
+        if threading.get_ident() == self._loop_thread:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def empty(self):
+        return not self._heap
+
+    def qsize(self):
+        return len(self._heap)
+
+    def drain(self):
+        """
+        Extrae todos los eventos listos, ordenados por prioridad y, a igual prioridad, en orden de llegada.
+        """
+        with self._lock:
+            heap, self._heap = self._heap, []
+        now = time.monotonic()
+        entries = []
+        while heap:
+            _, _, enqueued_at, event = heapq.heappop(heap)
+            entries.append((enqueued_at, event))
+        if self.coalesce_updates:
+            entries = self._coalesce(entries)
+        for enqueued_at, event in entries:
+            self._record_wait(event.event_type, now - enqueued_at)
+        return [event for _, event in entries]
+
+    async def get_batch(self):
+        """
+        Espera sin sondeo hasta que haya eventos y los devuelve todos en un solo lote.
+        """
+        while True:
+            self._wakeup.clear()
+            batch = self.drain()
+            if batch:
+                return batch
+            await self._wakeup.wait()
+
+# Planificador con envejecimiento y reparto justo entre tipos de evento
+class FairPriorityScheduler(AsyncPriorityScheduler):
+    """
+    Mantiene una cola por tipo de evento. Dentro de cada cola los eventos se ordenan por prioridad
+    envejecida: cada segundo de espera mejora la prioridad en `aging_rate` niveles, así que un evento
+    de baja prioridad termina adelantando a los nuevos de alta prioridad. Entre tipos se aplica
+    reparto ponderado (stride scheduling): cada evento servido de un tipo le cuesta
+    `fairness / peso` niveles de prioridad frente a los demás tipos.
+    """
+    def __init__(self, weights=None, aging_rate=1.0, fairness=1.0, max_batch=None,
+                 coalesce_updates=False):
+        super().__init__(coalesce_updates)
+        self.weights = dict(weights or {})  # tipo -> peso relativo (1 por defecto)
+        self.aging_rate = aging_rate  # Niveles de prioridad ganados por segundo de espera
+        self.fairness = fairness  # 0 = solo prioridad envejecida
+        self.max_batch = max_batch  # Máximo de eventos por lote (None = todos los pendientes)
+        self._epoch = time.monotonic()
+        self._queues = {}  # tipo -> montículo de (prioridad envejecida, seq, llegada, evento)
+        self._pass = {}  # tipo -> costo acumulado de los eventos servidos
+        self._size = 0
+
+    def _push(self, event):
+        # Se llama con self._lock tomado
+        self.enqueued += 1
+        now = time.monotonic()
+        # Ordenar por prioridad + aging_rate * llegada equivale a ordenar por la prioridad efectiva
+        # (prioridad - aging_rate * espera) en cualquier instante, así que la clave no cambia.
+        key = event.priority + self.aging_rate * (now - self._epoch)
+        queue = self._queues.get(event.event_type)
+        if not queue:
+            queue = self._queues[event.event_type] = []
+            # Un tipo que vuelve a tener eventos no conserva crédito de cuando estaba inactivo
+            backlogged = [self._pass[t] for t, q in self._queues.items() if q and t in self._pass]
+            self._pass[event.event_type] = max(self._pass.get(event.event_type, 0.0),
+                                               min(backlogged, default=0.0))
+        heapq.heappush(queue, (key, next(self._seq), now, event))
+        self._size += 1
+
+    def empty(self):
+        return self._size == 0
+
+    def qsize(self):
+        return self._size
+
+    def drain(self):
+        """
+        Extrae hasta `max_batch` eventos eligiendo en cada paso el tipo cuya cabeza tiene la menor
+        prioridad envejecida más su costo de reparto acumulado. Los update_state se fusionan
+        solo dentro del lote, que ya está en orden de despacho.
+        """
+        entries = []
+        with self._lock:
+            now = time.monotonic()
+            limit = self.max_batch or self._size
+            while self._size and len(entries) < limit:
+                event_type = min((t for t, q in self._queues.items() if q),
+                                 key=lambda t: self._queues[t][0][0] + self.fairness * self._pass[t])
+                _, _, enqueued_at, event = heapq.heappop(self._queues[event_type])
+                self._size -= 1
+                self._pass[event_type] += 1.0 / self.weights.get(event_type, 1)
+                entries.append((enqueued_at, event))
+            if self.coalesce_updates:
+                entries = self._coalesce(entries)
+            for enqueued_at, event in entries:
+                self._record_wait(event.event_type, now - enqueued_at)
+        return [event for _, event in entries]
+
+# Caché LRU de celdas compiladas
+class CompiledCellCache:
+    """
+    Asocia el hash del código fuente de una celda con su objeto de código compilado,
+    para no volver a analizar y compilar celdas que se ejecutan repetidamente.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize  # Número máximo de celdas compiladas en memoria
+        self._entries = OrderedDict()  # hash -> objeto de código, en orden de uso
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def source_hash(source):
+        return hashlib.blake2b(source.encode('utf-8'), digest_size=16).digest()
+
+    def get(self, source):
+        """
+        Devuelve el código compilado de la celda, compilándolo si no está en caché.
+        Lanza SyntaxError si la celda no compila.
+        """
+        key = self.source_hash(source)
+        with self._lock:
+            code = self._entries.get(key)
+            if code is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return code
+            self.misses += 1
+        code = compile(source, '<cell>', 'exec')
+        with self._lock:
+            self._entries[key] = code
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return code
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+# Conjuntos de lectura/escritura de una celda. Una celda "opaca" muta objetos a través de
+# atributos o subíndices y no puede analizarse por nombre, así que conflictúa con todo.
+# `callables` son los nombres que la celda podría enlazar a una función o clase propia: llamarlas
+# tiene efectos que el análisis por nombre no ve.
+CellAccess = namedtuple('CellAccess', ['reads', 'writes', 'opaque', 'callables'], defaults=(frozenset(),))
+
+_LOAD_OPS = {'LOAD_NAME', 'LOAD_GLOBAL'}
+_STORE_OPS = {'STORE_NAME', 'STORE_GLOBAL', 'DELETE_NAME', 'DELETE_GLOBAL'}
+_ATTR_OPS = {'LOAD_ATTR', 'LOAD_METHOD'}
+_OPAQUE_OPS = {'STORE_ATTR', 'DELETE_ATTR', 'STORE_SUBSCR', 'DELETE_SUBSCR'}
+_IMPORT_OPS = {'IMPORT_NAME', 'IMPORT_FROM'}
+
+@functools.lru_cache(maxsize=1024)
+def analyze_cell(code):
+    """
+    Obtiene los nombres que lee y escribe una celda compilada recorriendo su bytecode.
+    Un nombre cuyo atributo se accede (p. ej. `lista.append`) se considera escrito, salvo que
+    la propia celda lo haya importado.
+    """
+    reads, writes, mutated, imported, opaque = set(), set(), set(), set(), False
+    defines_code = any(hasattr(const, 'co_code') for const in code.co_consts)
+    pending = [code]
+    while pending:
+        current = pending.pop()
+        previous = None
+        for instr in dis.get_instructions(current):
+            if instr.opname in _LOAD_OPS:
+                reads.add(instr.argval)
+            elif instr.opname in _STORE_OPS:
+                if previous is not None and previous.opname in _IMPORT_OPS:
+                    imported.add(instr.argval)
+                else:
+                    writes.add(instr.argval)
+            elif instr.opname in _OPAQUE_OPS:
+                opaque = True
+            elif instr.opname in _ATTR_OPS and previous is not None and previous.opname in _LOAD_OPS:
+                mutated.add(previous.argval)
+            previous = instr
+        pending.extend(const for const in current.co_consts if hasattr(const, 'co_code'))
+    # Importar un módulo vuelve a enlazar el mismo objeto, así que cuenta como lectura
+    writes |= mutated - imported
+    callables = frozenset(writes) if defines_code else frozenset()
+    return CellAccess(frozenset(reads | imported), frozenset(writes), opaque, callables)
+
+def build_dependency_dag(accesses):
+    """
+    Construye el DAG de dependencias para una lista de accesos en orden de prioridad.
+    Retorna, para cada posición, los índices anteriores de los que depende.
+    Un acceso None actúa como barrera: depende de todo lo anterior y todo lo posterior depende de él.
+    Leer un nombre que una celda anterior del lote enlazó a una función propia también es una barrera.
+    """
+    last_writer = {}  # nombre -> último índice que lo escribe
+    readers = {}  # nombre -> índices que lo leen desde la última escritura
+    since_barrier = []  # índices desde la última barrera
+    callables = set()  # nombres definidos como funciones desde la última barrera
+    barrier = None
+    deps = []
+    for index, access in enumerate(accesses):
+        if access is None or access.opaque or not callables.isdisjoint(access.reads):
+            deps.append(set(since_barrier) | ({barrier} if barrier is not None else set()))
+            barrier, since_barrier, last_writer, readers = index, [], {}, {}
+            callables = set(access.callables) if access is not None else set()
+            continue
+        callables.update(access.callables)
+        node_deps = {barrier} if barrier is not None else set()
+        for name in access.reads:
+            if name in last_writer:
+                node_deps.add(last_writer[name])
+        for name in access.writes:
+            if name in last_writer:
+                node_deps.add(last_writer[name])
+            node_deps.update(readers.get(name, ()))
+        for name in access.reads:
+            readers.setdefault(name, []).append(index)
+        for name in access.writes:
+            last_writer[name] = index
+            readers[name] = []
+        node_deps.discard(index)
+        deps.append(node_deps)
+        since_barrier.append(index)
+    return deps
+
+_HEAPTYPE = 1 << 9  # Py_TPFLAGS_HEAPTYPE
+
+def is_user_callable(value):
+    """
+    Indica si un valor es invocable con efectos que no se pueden analizar por nombre:
+    todo lo invocable salvo las funciones y tipos implementados en C (len, math.sqrt, int...).
+    """
+    if isinstance(value, (types.BuiltinFunctionType, types.BuiltinMethodType)):
+        return False
+    if isinstance(value, type):
+        return bool(value.__flags__ & _HEAPTYPE)  # Clase definida en Python
+    return callable(value)
+
+_IMMUTABLE_TYPES = (int, float, complex, str, bytes, bool, frozenset, type(None))
+
+def values_equal(old, new):
+    """
+    Indica si un valor no cambió. El mismo objeto mutable cuenta como cambiado,
+    porque pudo modificarse en sitio.
+    """
+    if old is new:
+        return isinstance(new, _IMMUTABLE_TYPES)
+    try:
+        return bool(old == new)
+    except Exception:
+        return False
+
+_MISSING = object()
+
+# Simulación del cuaderno de notebook
+class Notebook:
+    def __init__(self, cache_size=256, parallel=False, max_workers=None, reactive=False,
+                 coalesce_updates=False, output=None, process_workers=0, cell_timeout=None,
+                 checkpoint_path=None, checkpoint_every=0, scheduler=None):
+        self.cells = []  # Lista de celdas de código
+        # Cola de eventos con prioridad (p. ej. FairPriorityScheduler para envejecimiento y reparto justo)
+        self.event_queue = scheduler or AsyncPriorityScheduler()
+        self.event_queue.coalesce_updates = self.event_queue.coalesce_updates or coalesce_updates
+        self.state = {}  # Estado compartido para la ejecución de celdas
+        self.lock = threading.Lock()  # Bloqueo para asegurar operaciones seguras en concurrencia
+        self.compiled_cells = CompiledCellCache(cache_size)  # Caché de celdas compiladas
+        self.parallel = parallel  # Ejecuta en paralelo las celdas independientes de cada lote
+        self.max_workers = max_workers
+        self.executor = None  # Pool de hilos, creado al primer lote paralelo
+        self.reactive = reactive  # Re-ejecuta las celdas afectadas al actualizar el estado
+        self.cell_access = []  # CellAccess de cada celda, en el mismo orden que self.cells
+        self.readers_index = {}  # variable -> índices de las celdas que la leen
+        self.reactive_stats = {'updates': 0, 'skipped': 0, 'reruns': 0}
+        self.output = output or OutputSink()  # Destino de los mensajes de log y consola
+        self.cell_timeout = cell_timeout  # Timeout por celda (solo con procesos trabajadores)
+        # Pool de procesos precalentados que ejecutan las celdas fuera del bucle de eventos
+        self.cell_pool = CellProcessPool(self.state, process_workers, cell_timeout) if process_workers else None
+        # Registro de solo-anexado con checkpoints y eventos para restaurar el notebook
+        self.journal = CheckpointLog(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_every = checkpoint_every  # Eventos entre checkpoints automáticos (0 = manual)
+
+    def add_cell(self, cell):
+        """
+        Agrega una nueva celda de código al notebook.
+        La celda se precompila, por lo que un error de sintaxis se reporta aquí y no al ejecutarla.
+        """
+        try:
+            access = analyze_cell(self.compiled_cells.get(cell))
+        except SyntaxError as e:
+            self.output.error('Syntax error in cell: %s, Error: %s', cell, e, console=False)
+            raise
+        with self.lock:
+            index = len(self.cells)
+            self.cells.append(cell)
+            self.cell_access.append(access)
+            for name in access.reads:
+                self.readers_index.setdefault(name, []).append(index)
+        if self.journal is not None:
+            self.journal.append_events([('add_cell', cell)])
+        self.output.info('Cell added: %s', cell, console=False)
+
+    def checkpoint(self):
+        """
+        Guarda una instantánea de las partes serializables del estado y de las celdas.
+        Retorna el número de bytes escritos.
+        """
+        with self.lock:
+            state, cells = dict(self.state), list(self.cells)
+        written = self.journal.write_checkpoint(state, cells)
+        self.output.info('Checkpoint written: %s bytes', written, console=False)
+        return written
+
+    @classmethod
+    def restore(cls, checkpoint_path, checkpoint_every=0, **kwargs):
+        """
+        Crea un notebook a partir del último checkpoint del archivo y vuelve a aplicar
+        solo los eventos registrados después de él.
+        """
+        state, cells, events = load_latest(checkpoint_path)
+        notebook = cls(**kwargs)
+        for cell in cells or ():
+            notebook.add_cell(cell)
+        if state:
+            notebook.state.update(state)
+            if notebook.cell_pool is not None:
+                notebook.cell_pool.mark_dirty(list(state))
+        for event_type, data in events:
+            if event_type == 'add_cell':
+                notebook.add_cell(data)
+            elif event_type == 'update_state':
+                notebook.update_state(*data)
+            elif event_type == 'execute_cell':
+                notebook.run_cell(data)
+        notebook.journal = CheckpointLog(checkpoint_path)
+        notebook.journal.events_since_checkpoint = len(events)
+        notebook.checkpoint_every = checkpoint_every
+        return notebook
+
+    def cache_stats(self):
+        """
+        Devuelve los contadores de aciertos, fallos y desalojos de la caché de celdas compiladas.
+        """
+        return self.compiled_cells.stats()
+
+    def update_state(self, key, value):
+        """
+        Actualiza el estado compartido con una nueva clave y valor.
+        En modo reactivo re-ejecuta solo las celdas que dependen de la clave,
+        y no hace nada si el valor nuevo es igual al anterior.
+        """
+        with self.lock:
+            old = self.state.get(key, _MISSING)
+            self.state[key] = value
+        self.output.info('State updated: %s = %s', key, value)
+        if self.cell_pool is not None:
+            self.cell_pool.mark_dirty([key])
+        if self.reactive:
+            self.reactive_stats['updates'] += 1
+            if old is not _MISSING and values_equal(old, value):
+                self.reactive_stats['skipped'] += 1
+                return
+            self.rerun_dependents({key})
+
+    def rerun_dependents(self, changed):
+        """
+        Re-ejecuta, en orden topológico (orden de las celdas), solo las celdas que leen
+        alguna variable cambiada, propagando los cambios a las celdas posteriores.
+        Retorna la lista de índices de celdas re-ejecutadas.
+        """
+        dirty = set(changed)
+        pending = []  # montículo de índices de celdas candidatas
+        queued = set()
+
+        def enqueue(names, after):
+            for name in names:
+                for index in self.readers_index.get(name, ()):
+                    if index > after and index not in queued:
+                        queued.add(index)
+                        heapq.heappush(pending, index)
+
+        enqueue(dirty, -1)
+        rerun = []
+        while pending:
+            index = heapq.heappop(pending)
+            access = self.cell_access[index]
+            if not dirty.intersection(access.reads):
+                continue
+            # Una celda opaca puede mutar cualquier variable que lee
+            watched = access.writes | access.reads if access.opaque else access.writes
+            before = {name: self.state.get(name, _MISSING) for name in watched}
+            self.run_cell(self.cells[index])
+            rerun.append(index)
+            updated = {name for name, old in before.items()
+                       if old is _MISSING or access.opaque
+                       or not values_equal(old, self.state.get(name, _MISSING))}
+            dirty |= updated
+            enqueue(updated, index)
+        self.reactive_stats['reruns'] += len(rerun)
+        return rerun
+
+    async def execute_cell(self, cell):
+        """
+        Ejecuta una celda de código en el estado compartido.
+        Con procesos trabajadores la celda se ejecuta en el pool y aquí solo se espera su futuro.
+        """
+        if self.cell_pool is None:
+            self.run_cell(cell)
+            return
+        try:
+            access = analyze_cell(self.compiled_cells.get(cell))
+            tracked = access.writes | access.reads if access.opaque else access.writes
+            error = await self.cell_pool.submit(cell, tracked)
+        except (SyntaxError, asyncio.TimeoutError, WorkerExitedError) as e:
+            error = e
+        if error is None:
+            self.output.info('Executed cell: %s', cell)
+        else:
+            self.output.error('Error executing cell: %s, Error: %s', cell, error)
+
+    def run_cell(self, cell):
+        """
+        Cuerpo síncrono de execute_cell; es lo que se envía al pool en modo paralelo.
+        """
+        try:
+            code = self.compiled_cells.get(cell)
+            exec(code, self.state)
+            self.output.info('Executed cell: %s', cell)
+        except Exception as e:
+            self.output.error('Error executing cell: %s, Error: %s', cell, e)
+            return
+        if self.cell_pool is not None:
+            # Ejecución local (p. ej. re-ejecución reactiva): los trabajadores deben resincronizarse
+            access = analyze_cell(code)
+            self.cell_pool.mark_dirty(access.writes | access.reads if access.opaque else access.writes)
+
+    async def handle_event(self, event):
+        """
+        Maneja los eventos según su tipo.
+        """
+        if event.event_type == 'execute_cell':
+            await self.execute_cell(event.data)
+        elif event.event_type == 'update_state':
+            self.update_state(*event.data)
+        else:
+            self.output.warning('Unknown event type: %s', event.event_type)
+
+    def event_access(self, event):
+        """
+        Retorna el CellAccess de un evento, o None si debe tratarse como barrera.
+        """
+        if event.event_type == 'execute_cell':
+            try:
+                access = analyze_cell(self.compiled_cells.get(event.data))
+            except SyntaxError:
+                return None
+            # Llamar a una función o clase del notebook puede leer y escribir cualquier global
+            state = self.state
+            if any(name in state and is_user_callable(state[name]) for name in access.reads):
+                return None
+            return access
+        if event.event_type == 'update_state' and not self.reactive:
+            return CellAccess(frozenset(), frozenset([event.data[0]]), False)
+        return None  # En modo reactivo una actualización puede re-ejecutar cualquier celda
+
+    async def process_batch(self, events):
+        """
+        Procesa un lote de eventos ya ordenado por prioridad.
+        En modo paralelo, los eventos independientes se ejecutan a la vez en un pool de hilos y
+        los que entran en conflicto respetan el orden de prioridad según el DAG de dependencias.
+        """
+        if self.journal is not None:
+            skipped = self.journal.append_events([(event.event_type, event.data) for event in events
+                                                  if event.event_type in ('execute_cell', 'update_state')])
+            for event_type, data in skipped:
+                # Un valor no serializable no se puede reproducir al restaurar, pero no detiene el bucle
+                self.output.warning('Event not journaled (unpicklable data): %s %r', event_type,
+                                    data[0] if event_type == 'update_state' else data)
+        await self._run_batch(events)
+        if self.checkpoint_every and self.journal.events_since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+    async def _run_batch(self, events):
+        if not self.parallel or len(events) < 2:
+            for event in events:
+                await self.handle_event(event)
+            return
+        deps = build_dependency_dag([self.event_access(event) for event in events])
+        if all(i - 1 in node_deps for i, node_deps in enumerate(deps) if i):
+            # Cadena totalmente secuencial: el pool solo agregaría sobrecarga
+            for event in events:
+                await self.handle_event(event)
+            return
+        if self.executor is None and self.cell_pool is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        loop = asyncio.get_running_loop()
+        tasks = []
+
+        async def run(event, waits):
+            if waits:
+                await asyncio.gather(*waits)
+            if event.event_type == 'execute_cell' and self.cell_pool is None:
+                await loop.run_in_executor(self.executor, self.run_cell, event.data)
+            else:
+                await self.handle_event(event)
+
+        for event, node_deps in zip(events, deps):
+            tasks.append(asyncio.ensure_future(run(event, [tasks[i] for i in node_deps])))
+        await asyncio.gather(*tasks)
+
+    async def event_loop(self):
+        """
+        Bucle principal de eventos que maneja y procesa eventos de la cola.
+        Se despierta en cuanto llega un evento y procesa todos los pendientes en una pasada.
+        """
+        self.event_queue.bind(asyncio.get_running_loop())
+        while True:
+            await self.process_batch(await self.event_queue.get_batch())
+
+    def add_event(self, event):
+        """
+        Agrega un nuevo evento a la cola de eventos.
+        Puede llamarse desde una corrutina o desde otro hilo.
+        """
+        self.event_queue.put(event)
+        self.output.info('Event added: %s with priority %s', event.event_type, event.priority)
+
+    def add_events(self, events):
+        """
+        Agrega un lote de eventos con una sola toma del bloqueo de la cola,
+        un solo registro de log y una sola línea de consola.
+        """
+        count = self.event_queue.put_many(events)
+        self.output.info('Events added: %s', count)
+        return count
+
+    def close(self):
+        """
+        Libera el pool de hilos, los procesos trabajadores, el registro de checkpoints y el destino de salida.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.cell_pool is not None:
+            self.cell_pool.close()
+        if self.journal is not None:
+            self.journal.close()
+        self.output.close()
+
+    def queue_stats(self):
+        """
+        Devuelve cuántos eventos se encolaron y cuántos update_state se fusionaron.
+        """
+        return {'enqueued': self.event_queue.enqueued, 'coalesced': self.event_queue.coalesced,
+                'pending': self.event_queue.qsize()}
+
+    def wait_stats(self):
+        """
+        Devuelve el tiempo de espera en cola por tipo de evento.
+        """
+        return self.event_queue.wait_stats()
+
+# Simulación de interacciones de usuario
+async def user_interactions(notebook):
+    """
+    Simula interacciones del usuario con el notebook.
+    """
+    notebook.add_event(Event(priority=1, event_type='update_state', data=('var1', 10)))
+    notebook.add_event(Event(priority=2, event_type='execute_cell', data="print('Hello, world!')"))
+    notebook.add_event(Event(priority=1, event_type='execute_cell', data="print(var1)"))
+
+# Ejecución del sistema
+async def main():
+    """
+    Función principal para iniciar el sistema de notebook y las interacciones del usuario.
+    """
+    notebook = Notebook()
+    await asyncio.gather(
+        notebook.event_loop(),
+        user_interactions(notebook)
+    )
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logging.info('Shutting down the event loop.')
+        print('Shutting down the event loop.')  # Output para la consola
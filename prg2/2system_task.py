@@ -1,25 +1,131 @@
 import concurrent.futures
-from collections import defaultdict
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from operator import attrgetter
+from pathlib import Path
 from queue import Queue
-from typing import List, Dict, Optional, Tuple, Any
+from typing import Callable, List, Dict, Optional, Set, Tuple, Any
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import percentile
+
+try:
+    import numpy as np
+except ImportError:  # Las APIs masivas caen a una implementación en Python puro
+    np = None
+
+# Códigos de la matriz de orden causal: order[i][j] describe la relación del evento i con el j
+HAPPENED_BEFORE = 1  # i -> j
+HAPPENED_AFTER = -1  # j -> i
+CONCURRENT = 0  # i || j
+IDENTICAL = 2  # relojes iguales
+
+# Máximo de comparaciones elemento a elemento (filas x eventos x procesos) por bloque
+CAUSAL_CHUNK_ELEMENTS = 1 << 24
+
+# Marca de una clave borrada en las instantáneas incrementales
+_DELETED = object()
+
+# Generación de cada ranura del heap por columnas (PooledGenerationalGC)
+SLOT_FREE = -1
+SLOT_YOUNG = 0
+SLOT_OLD = 1
+
+# Tamaño a partir del cual la mezcla de relojes vectoriales usa NumPy en lugar de un bucle
+VECTOR_CLOCK_NUMPY_MIN = 64
 
 class VectorClock:
-    """Implementa un reloj vectorial para el ordenamiento parcial de eventos."""
+    """
+    Implementa un reloj vectorial para el ordenamiento parcial de eventos, respaldado por
+    array('Q') (y una vista NumPy para mezclas vectorizadas en relojes grandes).
+    `encode_for`/`merge_delta` implementan relojes diferenciales de Singhal-Kshemkalyani:
+    a cada robot solo se le envían las entradas que cambiaron desde el último envío a ese
+    robot, lo que requiere canales FIFO.
+    """
     def __init__(self, num_processes: int):
-        self.clock: List[int] = [0] * num_processes
+        self.clock: array = array('Q', bytes(8 * num_processes))
         self.process_id: Optional[int] = None
+        # Valor del componente local cuando cambió cada entrada (LU) y en el último envío a cada robot (LS)
+        self.last_update: array = array('Q', bytes(8 * num_processes))
+        self.last_sent: Dict[int, int] = {}
+        self._vectorized = np is not None and num_processes >= VECTOR_CLOCK_NUMPY_MIN
+        if self._vectorized:
+            self._clock_view = np.frombuffer(self.clock, dtype=np.uint64)
+            self._update_view = np.frombuffer(self.last_update, dtype=np.uint64)
 
     def update(self, other_clock: List[int]) -> None:
         """Actualiza el reloj vectorial con otro reloj."""
-        for i in range(len(self.clock)):
-            self.clock[i] = max(self.clock[i], other_clock[i])
-        if self.process_id is not None:
-            self.clock[self.process_id] += 1
+        if self._vectorized:
+            other = np.asarray(other_clock, dtype=np.uint64)
+            changed = np.flatnonzero(other > self._clock_view)
+            self._merge(changed, other[changed])
+        else:
+            clock = self.clock
+            changed = [i for i, value in enumerate(other_clock) if value > clock[i]]
+            self._merge(changed, [other_clock[i] for i in changed])
 
     def increment(self) -> None:
         """Incrementa el componente local del reloj vectorial."""
         if self.process_id is not None:
             self.clock[self.process_id] += 1
+            self.last_update[self.process_id] = self.clock[self.process_id]
+
+    def encode_for(self, peer: int) -> bytes:
+        """
+        Codifica el reloj para enviarlo a `peer`: número de entradas (uint32), sus índices
+        (uint32) y sus valores (uint64), solo de las entradas cambiadas desde el último envío.
+        """
+        since = self.last_sent.get(peer, 0)
+        if self._vectorized:
+            indices = np.flatnonzero(self._update_view > since).astype(np.uint32)
+            values = self._clock_view[indices]
+        else:
+            indices = array('I', [i for i, changed_at in enumerate(self.last_update) if changed_at > since])
+            values = array('Q', [self.clock[i] for i in indices])
+        if self.process_id is not None:
+            self.last_sent[peer] = self.clock[self.process_id]
+        return array('I', [len(indices)]).tobytes() + indices.tobytes() + values.tobytes()
+
+    def merge_delta(self, payload: bytes) -> None:
+        """Recibe un reloj codificado con encode_for: mezcla sus entradas e incrementa el componente local."""
+        count = array('I', payload[:4])[0]
+        split = 4 + 4 * count
+        if self._vectorized:
+            indices = np.frombuffer(payload, dtype=np.uint32, count=count, offset=4)
+            values = np.frombuffer(payload, dtype=np.uint64, count=count, offset=split)
+            greater = values > self._clock_view[indices]
+            self._merge(indices[greater], values[greater])
+        else:
+            indices = array('I', payload[4:split])
+            values = array('Q', payload[split:])
+            clock = self.clock
+            changed = [(i, value) for i, value in zip(indices, values) if value > clock[i]]
+            self._merge([i for i, _ in changed], [value for _, value in changed])
+
+    def encode_full(self) -> bytes:
+        """Codificación completa (N entradas uint64), como referencia frente a encode_for."""
+        return self.clock.tobytes()
+
+    def _merge(self, indices, values) -> None:
+        """Copia `values` en `indices`, incrementa el componente local y actualiza LU."""
+        if self._vectorized:
+            self._clock_view[indices] = values
+        else:
+            for i, value in zip(indices, values):
+                self.clock[i] = value
+        self.increment()
+        local = self.clock[self.process_id] if self.process_id is not None else 0
+        if self._vectorized:
+            self._update_view[indices] = local
+        else:
+            for i in indices:
+                self.last_update[i] = local
 
 class Robot:
     """Representa un robot en el sistema de coordinación."""
@@ -37,8 +143,48 @@ class RaymondTree:
         self.robot_id: int = robot_id
         self.parent: Optional['RaymondTree'] = parent
         self.children: List['RaymondTree'] = []
+        self.child_ids: Set[int] = set()
         self.queue: Queue = Queue()
         self.has_token: bool = False
+        # Estado del motor de paso de mensajes (RaymondMutex)
+        self.holder: int = robot_id  # vecino en dirección al token (él mismo si lo tiene)
+        self.asked: bool = False  # ya se envió una solicitud al holder
+        self.using: bool = False  # el robot está en la sección crítica
+        # Índice robot_id -> nodo compartido por todos los nodos del mismo árbol
+        self.index: Dict[int, 'RaymondTree'] = {robot_id: self}
+        if parent is not None:
+            parent.add_child(self)
+
+    def add_child(self, child: 'RaymondTree') -> None:
+        """Cuelga un nodo (con su subárbol) de este nodo y lo incorpora al índice del árbol."""
+        if child.parent is not None and child.parent is not self:
+            child.parent.remove_child(child)
+        child.parent = self
+        if child.robot_id not in self.child_ids:
+            self.children.append(child)
+            self.child_ids.add(child.robot_id)
+        if child.index is not self.index:
+            subtree = child.index
+            self.index.update(subtree)
+            for node in subtree.values():
+                node.index = self.index
+
+    def remove_child(self, child: 'RaymondTree') -> None:
+        """Separa un hijo; su subárbol pasa a tener un índice propio."""
+        if child.robot_id not in self.child_ids:
+            return
+        self.child_ids.discard(child.robot_id)
+        self.children.remove(child)
+        child.parent = None
+        subtree: Dict[int, RaymondTree] = {}
+        pending = [child]
+        while pending:
+            node = pending.pop()
+            subtree[node.robot_id] = node
+            self.index.pop(node.robot_id, None)
+            pending.extend(node.children)
+        for node in subtree.values():
+            node.index = subtree
 
     def request_resource(self, requester_id: int) -> bool:
         """Solicita un recurso. Retorna True si está disponible inmediatamente."""
@@ -63,8 +209,8 @@ class RaymondTree:
 
         if not self.queue.empty():
             next_robot = self.queue.get()
-            if next_robot in [child.robot_id for child in self.children]:
-                child = next(child for child in self.children if child.robot_id == next_robot)
+            if next_robot in self.child_ids:
+                child = self.index[next_robot]
                 self.has_token = False
                 child.has_token = True
                 return None
@@ -76,21 +222,309 @@ class RaymondTree:
             return (self.parent.robot_id, self.robot_id)
         return None
 
-    def find_node(self, robot_id: int) -> 'RaymondTree':
-        """Encuentra el nodo correspondiente a un robot en el árbol."""
-        if self.robot_id == robot_id:
-            return self
-        for child in self.children:
-            result = child.find_node(robot_id)
-            if result:
-                return result
-        return None
+    def find_node(self, robot_id: int) -> Optional['RaymondTree']:
+        """Encuentra en O(1) el nodo correspondiente a un robot en el árbol."""
+        return self.index.get(robot_id)
+
+    def path_to(self, robot_id: int) -> List[int]:
+        """Retorna los robots que recorre un mensaje desde este nodo hasta `robot_id`, ambos incluidos."""
+        up: List[int] = []
+        depth: Dict[int, int] = {}
+        node = self
+        while node is not None:
+            depth[node.robot_id] = len(up)
+            up.append(node.robot_id)
+            node = node.parent
+        down: List[int] = []
+        node = self.index[robot_id]
+        while node.robot_id not in depth:
+            down.append(node.robot_id)
+            node = node.parent
+        return up[:depth[node.robot_id] + 1] + down[::-1]
+
+    def make_root(self) -> 'RaymondTree':
+        """
+        Convierte este nodo en la raíz de su árbol invirtiendo los enlaces del camino hasta la
+        raíz actual. El token, si lo tenía la raíz anterior, pasa a este nodo.
+        """
+        path = [self]
+        while path[-1].parent is not None:
+            path.append(path[-1].parent)
+        old_root = path[-1]
+        for child, parent in zip(path, path[1:]):
+            parent.children.remove(child)
+            parent.child_ids.discard(child.robot_id)
+            child.children.append(parent)
+            child.child_ids.add(parent.robot_id)
+            parent.parent = child
+        self.parent = None
+        if old_root is not self and old_root.has_token:
+            old_root.has_token = False
+            self.has_token = True
+        return self
+
+class MessageBus:
+    """
+    Bus de mensajes en proceso: un hilo entrega en orden FIFO los mensajes entre robots y
+    los despacha al manejador registrado para cada recurso.
+    """
+    def __init__(self, name: str = 'message-bus'):
+        self.inbox: Queue = Queue()
+        self.handlers: Dict[str, Callable[[str, int, int], None]] = {}
+        self.delivered: Counter = Counter()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def register(self, resource_id: str, handler: Callable[[str, int, int], None]) -> None:
+        """Registra el manejador de los mensajes de un recurso."""
+        self.handlers[resource_id] = handler
+
+    def send(self, resource_id: str, kind: str, from_robot: int, to_robot: int) -> None:
+        """Encola un mensaje; se entrega de forma asíncrona en el hilo del bus."""
+        self.inbox.put((resource_id, kind, from_robot, to_robot))
+
+    def _run(self) -> None:
+        while True:
+            message = self.inbox.get()
+            if message is None:
+                return
+            resource_id, kind, from_robot, to_robot = message
+            self.delivered[kind] += 1
+            try:
+                self.handlers[resource_id](kind, from_robot, to_robot)
+            except Exception as exc:
+                print(f"Error delivering {kind} for resource {resource_id} to robot {to_robot}: {exc!r}")
+
+    def close(self) -> None:
+        """Detiene el hilo del bus después de entregar los mensajes pendientes."""
+        self.inbox.put(None)
+        self._thread.join()
+
+class RaymondMutex:
+    """
+    Exclusión mutua de Raymond por paso de mensajes sobre el árbol de un recurso. Cada nodo
+    apunta con `holder` al vecino en dirección al token; las solicitudes se reenvían hacia el
+    token (una sola vez por nodo gracias a `asked`) y el token viaja de vuelta por el mismo camino.
+    Todo el estado de los nodos se modifica solo en el hilo del bus. Con `system` y su registro
+    causal activo, cada REQUEST y PRIVILEGE se estampa al enviarse y al entregarse.
+    """
+    # Nombre de los eventos del registro causal para cada mensaje entre nodos
+    _LOGGED = {'REQUEST': ('request_sent', 'request_received'),
+               'PRIVILEGE': ('token_sent', 'token_received')}
+
+    def __init__(self, resource_id: str, tree: RaymondTree, bus: MessageBus,
+                 system: Optional['RobotCoordinationSystem'] = None):
+        self.resource_id: str = resource_id
+        self.tree: RaymondTree = tree
+        self.bus: MessageBus = bus
+        self.system: Optional['RobotCoordinationSystem'] = system
+        for node in tree.index.values():  # el token parte en la raíz
+            node.holder = node.parent.robot_id if node.parent else node.robot_id
+            node.has_token = node.parent is None
+            node.asked = False
+            node.using = False
+        self.waiters: Dict[int, threading.Event] = {}
+        self.requested_at: Dict[int, float] = {}
+        self.in_cs: Optional[int] = None
+        self.entries: int = 0
+        self.contended: int = 0  # entradas que tuvieron que esperar el token o a otro robot
+        self.violations: int = 0  # concesiones con otro robot todavía en la sección crítica
+        self.sent: Counter = Counter()
+        self.wait_times: deque = deque(maxlen=100_000)
+        self.started: float = time.perf_counter()
+        self._delivering: Optional[str] = None
+        # (tipo, origen, destino) -> reloj del envío; `asked` y el token único dejan a lo sumo
+        # un mensaje de cada clave en tránsito
+        self._sent_clocks: Dict[Tuple[str, int, int], List[int]] = {}
+        bus.register(resource_id, self.deliver)
+
+    def acquire(self, robot_id: int) -> None:
+        """Bloquea al hilo llamador hasta que `robot_id` entra en la sección crítica."""
+        granted = threading.Event()
+        self.waiters[robot_id] = granted
+        self.requested_at[robot_id] = time.perf_counter()
+        self.bus.send(self.resource_id, 'ACQUIRE', robot_id, robot_id)
+        granted.wait()
+
+    def release(self, robot_id: int) -> None:
+        """Sale de la sección crítica; el token se cede de forma asíncrona."""
+        self.bus.send(self.resource_id, 'RELEASE', robot_id, robot_id)
+
+    @contextmanager
+    def locked(self, robot_id: int):
+        """Context manager que envuelve acquire/release."""
+        self.acquire(robot_id)
+        try:
+            yield
+        finally:
+            self.release(robot_id)
+
+    def deliver(self, kind: str, from_robot: int, to_robot: int) -> None:
+        """Procesa un mensaje en el nodo destino (se ejecuta en el hilo del bus)."""
+        node = self.tree.index[to_robot]
+        self._delivering = kind
+        if kind in self._LOGGED and self.system is not None and self.system.event_log is not None:
+            self.system.log_event(to_robot, self._LOGGED[kind][1], self.resource_id,
+                                  received_clock=self._sent_clocks.pop((kind, from_robot, to_robot), None))
+        if kind == 'ACQUIRE':
+            node.queue.put(to_robot)
+        elif kind == 'REQUEST':
+            node.queue.put(from_robot)
+        elif kind == 'PRIVILEGE':
+            node.holder = node.robot_id
+            node.has_token = True
+        elif kind == 'RELEASE':
+            node.using = False
+            self.in_cs = None
+        self._assign_privilege(node)
+        self._make_request(node)
+
+    def _assign_privilege(self, node: RaymondTree) -> None:
+        if node.holder != node.robot_id or node.using or node.queue.empty():
+            return
+        node.holder = node.queue.get()
+        node.asked = False
+        if node.holder == node.robot_id:
+            node.using = True
+            self._grant(node.robot_id)
+        else:
+            node.has_token = False
+            self._send('PRIVILEGE', node.robot_id, node.holder)
+
+    def _make_request(self, node: RaymondTree) -> None:
+        if node.holder != node.robot_id and not node.asked and not node.queue.empty():
+            node.asked = True
+            self._send('REQUEST', node.robot_id, node.holder)
+
+    def _send(self, kind: str, from_robot: int, to_robot: int) -> None:
+        self.sent[kind] += 1
+        if self.system is not None and self.system.event_log is not None:
+            sent = self.system.log_event(from_robot, self._LOGGED[kind][0], self.resource_id)
+            self._sent_clocks[(kind, from_robot, to_robot)] = sent.vector_clock
+        self.bus.send(self.resource_id, kind, from_robot, to_robot)
+
+    def _grant(self, robot_id: int) -> None:
+        if self.in_cs is not None:
+            self.violations += 1
+        self.in_cs = robot_id
+        self.entries += 1
+        if self._delivering != 'ACQUIRE':
+            self.contended += 1
+        self.wait_times.append(time.perf_counter() - self.requested_at.pop(robot_id))
+        self.waiters.pop(robot_id).set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entradas, secciones críticas por segundo, mensajes por entrada y latencias de espera (s)."""
+        elapsed = time.perf_counter() - self.started
+        waits = sorted(self.wait_times)
+        messages = sum(self.sent.values())
+        return {
+            'entries': self.entries,
+            'contended': self.contended,
+            'throughput': self.entries / elapsed if elapsed else 0.0,
+            'messages': dict(self.sent),
+            'messages_per_entry': messages / self.entries if self.entries else 0.0,
+            'wait_mean': sum(waits) / len(waits) if waits else 0.0,
+            'wait_p50': percentile(waits, 0.5),
+            'wait_p99': percentile(waits, 0.99),
+            'wait_max': waits[-1] if waits else 0.0,
+            'violations': self.violations,
+        }
+
+class LockManager:
+    """
+    Gestor de bloqueos multi-recurso. Reparte los recursos por hash entre `num_shards`
+    fragmentos; cada fragmento es un MessageBus con su propio hilo y cola que atiende los
+    motores de Raymond de sus recursos. Las adquisiciones múltiples siguen un orden global
+    (orden lexicográfico del id de recurso), así que no pueden producir interbloqueos.
+    """
+    def __init__(self, system: 'RobotCoordinationSystem', num_shards: int = 4, **tree_options: Any):
+        self.system = system
+        self.tree_options: Dict[str, Any] = tree_options
+        self.shards: List[MessageBus] = [MessageBus(f'lock-shard-{i}') for i in range(num_shards)]
+        self.mutexes: Dict[str, RaymondMutex] = {}
+        self._lock = threading.Lock()
+
+    def shard_of(self, resource_id: str) -> int:
+        """Fragmento (estable entre ejecuciones) que atiende un recurso."""
+        return zlib.crc32(resource_id.encode()) % len(self.shards)
+
+    def mutex(self, resource_id: str) -> RaymondMutex:
+        """Retorna el motor de un recurso, creando su árbol la primera vez."""
+        mutex = self.mutexes.get(resource_id)
+        if mutex is None:
+            with self._lock:
+                mutex = self.mutexes.get(resource_id)
+                if mutex is None:
+                    tree = self.system.get_raymond_tree(resource_id, **self.tree_options)
+                    mutex = RaymondMutex(resource_id, tree, self.shards[self.shard_of(resource_id)], self.system)
+                    self.mutexes[resource_id] = mutex
+        return mutex
+
+    def acquire(self, robot_id: int, *resource_ids: str) -> List[str]:
+        """Adquiere uno o varios recursos en el orden global; retorna ese orden."""
+        ordered = sorted(set(resource_ids))
+        for resource_id in ordered:
+            self.mutex(resource_id).acquire(robot_id)
+        return ordered
+
+    def release(self, robot_id: int, *resource_ids: str) -> None:
+        """Libera los recursos en orden inverso al de adquisición."""
+        for resource_id in sorted(set(resource_ids), reverse=True):
+            self.mutexes[resource_id].release(robot_id)
+
+    @contextmanager
+    def locked(self, robot_id: int, *resource_ids: str):
+        """Context manager que envuelve acquire/release de varios recursos."""
+        self.acquire(robot_id, *resource_ids)
+        try:
+            yield
+        finally:
+            self.release(robot_id, *resource_ids)
+
+    def shard_stats(self) -> List[Dict[str, Any]]:
+        """Por fragmento: recursos, entradas, entradas con contención, mensajes entregados y esperas."""
+        per_shard: List[List[RaymondMutex]] = [[] for _ in self.shards]
+        for resource_id, mutex in list(self.mutexes.items()):
+            per_shard[self.shard_of(resource_id)].append(mutex)
+        stats = []
+        for shard_id, (bus, mutexes) in enumerate(zip(self.shards, per_shard)):
+            entries = sum(mutex.entries for mutex in mutexes)
+            contended = sum(mutex.contended for mutex in mutexes)
+            waits = sorted(wait for mutex in mutexes for wait in list(mutex.wait_times))
+            stats.append({
+                'shard': shard_id,
+                'resources': len(mutexes),
+                'entries': entries,
+                'contended': contended,
+                'contention': contended / entries if entries else 0.0,
+                'messages': sum(bus.delivered.values()),
+                'wait_mean': sum(waits) / len(waits) if waits else 0.0,
+                'wait_p99': percentile(waits, 0.99),
+            })
+        return stats
+
+    def close(self) -> None:
+        """Detiene los hilos de todos los fragmentos."""
+        for bus in self.shards:
+            bus.close()
 
 class ChandyLamportSnapshot:
     """Implementa el algoritmo de Chandy-Lamport para tomar instantáneas globales."""
-    def __init__(self, num_robots: int):
+    def __init__(self, num_robots: int, snapshot_id: int = 0, initiator: Optional[int] = None):
+        self.snapshot_id: int = snapshot_id
+        self.initiator: Optional[int] = initiator
         self.recorded_states: List[Optional[str]] = [None] * num_robots
         self.recorded_messages: Dict[int, List] = defaultdict(list)
+        # Recursos de cada robot: copia completa o, si bases[i] no es None, solo las claves
+        # que cambiaron desde la instantánea bases[i]
+        self.recorded_resources: List[Optional[Dict]] = [None] * num_robots
+        self.bases: List[Optional[int]] = [None] * num_robots
+        self.open_channels: Dict[int, Set[int]] = {}  # robot -> canales de entrada aún grabando
+        self.pending: int = num_robots  # robots que todavía no registran su estado
+        self.complete: bool = False
+        self.started: float = time.perf_counter()
+        self.duration: Optional[float] = None
 
     def record_state(self, robot_id: int, state: str) -> None:
         """Registra el estado de un robot en la instantánea."""
@@ -100,69 +534,744 @@ class ChandyLamportSnapshot:
         """Registra un mensaje entre robots en la instantánea."""
         self.recorded_messages[to_robot].append((from_robot, message))
 
+class SnapshotEngine:
+    """
+    Instantáneas de Chandy-Lamport sobre canales FIFO en proceso entre cada par de robots.
+    Cada instantánea tiene su propio id y sus marcadores, así que varias pueden solaparse.
+    En modo incremental cada robot registra solo las claves de `shared_resources` que
+    cambiaron (vía `set_resource`) desde su registro anterior; cada `full_every` registros
+    se guarda una copia completa para acotar la cadena de reconstrucción.
+    """
+    def __init__(self, robots: List[Robot], incremental: bool = True, full_every: int = 16,
+                 on_message: Optional[Callable[[int, int, Any], None]] = None):
+        self.robots: List[Robot] = robots
+        self.incremental: bool = incremental
+        self.full_every: int = full_every
+        self.on_message: Callable[[int, int, Any], None] = on_message or self._apply_message
+        self.on_complete: Optional[Callable[[ChandyLamportSnapshot], None]] = None
+        self.channels: Dict[Tuple[int, int], deque] = defaultdict(deque)
+        self.snapshots: Dict[int, ChandyLamportSnapshot] = {}
+        self.active: Dict[int, ChandyLamportSnapshot] = {}
+        self._next_id: int = 1
+        self._dirty: List[Set[Any]] = [set() for _ in robots]
+        self._last_recorded: List[Optional[int]] = [None] * len(robots)
+        self._chain_length: List[int] = [0] * len(robots)
+
+    def set_resource(self, robot_id: int, key: Any, value: Any = _DELETED) -> None:
+        """Modifica (o borra, sin `value`) un recurso del robot y lo marca para la próxima instantánea."""
+        resources = self.robots[robot_id].shared_resources
+        if value is _DELETED:
+            resources.pop(key, None)
+        else:
+            resources[key] = value
+        self._dirty[robot_id].add(key)
+
+    def send(self, from_robot: int, to_robot: int, message: Any) -> None:
+        """Envía un mensaje de aplicación por el canal FIFO from_robot -> to_robot."""
+        self.channels[(from_robot, to_robot)].append((False, message))
+
+    def initiate_snapshot(self, initiator_id: int) -> int:
+        """Inicia una instantánea: registra el estado del iniciador y envía marcadores. Retorna su id."""
+        snapshot_id = self._next_id
+        self._next_id += 1
+        snapshot = ChandyLamportSnapshot(len(self.robots), snapshot_id, initiator_id)
+        self.snapshots[snapshot_id] = snapshot
+        self.active[snapshot_id] = snapshot
+        self._record(snapshot, initiator_id)
+        return snapshot_id
+
+    def deliver(self, from_robot: int, to_robot: int) -> bool:
+        """Entrega el siguiente mensaje del canal; retorna False si estaba vacío."""
+        channel = self.channels.get((from_robot, to_robot))
+        if not channel:
+            return False
+        is_marker, payload = channel.popleft()
+        if is_marker:
+            snapshot = self.snapshots[payload]
+            if to_robot not in snapshot.open_channels:
+                self._record(snapshot, to_robot)
+            snapshot.open_channels[to_robot].discard(from_robot)
+            self._check_complete(snapshot)
+        else:
+            for snapshot in self.active.values():
+                if from_robot in snapshot.open_channels.get(to_robot, ()):
+                    snapshot.record_message(from_robot, to_robot, payload)
+            self.on_message(to_robot, from_robot, payload)
+        return True
+
+    def deliver_all(self) -> int:
+        """Entrega por turnos un mensaje de cada canal hasta vaciarlos; retorna cuántos entregó."""
+        delivered = 0
+        while True:
+            busy = [pair for pair, channel in self.channels.items() if channel]
+            if not busy:
+                return delivered
+            for from_robot, to_robot in busy:
+                delivered += self.deliver(from_robot, to_robot)
+
+    def global_state(self, snapshot_id: int) -> Dict[int, Dict]:
+        """Reconstruye los recursos registrados de cada robot siguiendo la cadena de deltas."""
+        snapshot = self.snapshots[snapshot_id]
+        state = {}
+        for robot_id in range(len(self.robots)):
+            chain = []
+            current = snapshot
+            while current is not None:
+                chain.append(current.recorded_resources[robot_id])
+                base = current.bases[robot_id]
+                current = self.snapshots[base] if base is not None else None
+            resources: Dict = {}
+            for recorded in reversed(chain):
+                resources.update(recorded)
+            state[robot_id] = {key: value for key, value in resources.items() if value is not _DELETED}
+        return state
+
+    def _record(self, snapshot: ChandyLamportSnapshot, robot_id: int) -> None:
+        robot = self.robots[robot_id]
+        snapshot.record_state(robot_id, robot.state)
+        base = self._last_recorded[robot_id]
+        if self.incremental and base is not None and self._chain_length[robot_id] < self.full_every:
+            resources = robot.shared_resources
+            snapshot.recorded_resources[robot_id] = {key: resources.get(key, _DELETED)
+                                                     for key in self._dirty[robot_id]}
+            snapshot.bases[robot_id] = base
+            self._chain_length[robot_id] += 1
+        else:
+            snapshot.recorded_resources[robot_id] = dict(robot.shared_resources)
+            self._chain_length[robot_id] = 0
+        self._dirty[robot_id] = set()
+        self._last_recorded[robot_id] = snapshot.snapshot_id
+        others = [other for other in range(len(self.robots)) if other != robot_id]
+        snapshot.open_channels[robot_id] = set(others)
+        snapshot.pending -= 1
+        for other in others:
+            self.channels[(robot_id, other)].append((True, snapshot.snapshot_id))
+        self._check_complete(snapshot)
+
+    def _check_complete(self, snapshot: ChandyLamportSnapshot) -> None:
+        if snapshot.complete or snapshot.pending:
+            return
+        if any(snapshot.open_channels.values()):
+            return
+        snapshot.complete = True
+        snapshot.duration = time.perf_counter() - snapshot.started
+        del self.active[snapshot.snapshot_id]
+        if self.on_complete is not None:
+            self.on_complete(snapshot)
+
+    def _apply_message(self, to_robot: int, from_robot: int, message: Any) -> None:
+        """Manejador por defecto: el mensaje es un dict de recursos a actualizar en el destino."""
+        for key, value in message.items():
+            self.set_resource(to_robot, key, value)
+
 class RobotMemoryObject:
     """Representa un objeto en la memoria del robot para el recolector de basura."""
+    __slots__ = ('age', 'references', 'fields', 'old', 'mark')
+
     def __init__(self):
         self.age: int = 0
         self.references: int = 1  # Número de referencias al objeto
+        self.fields: List['RobotMemoryObject'] = []  # Punteros salientes, usados por el modo de trazado
+        self.old: bool = False
+        self.mark: int = 0
 
     def is_live(self) -> bool:
         """Determina si un objeto está vivo (alcanzable)."""
         return self.references > 0
 
 class GenerationalGC:
-    """Implementa un recolector de basura generacional."""
-    def __init__(self):
+    """
+    Implementa un recolector de basura generacional. Con `tracing=True` la vivacidad se decide
+    trazando el grafo de objetos desde `roots`; la barrera de escritura (`write_reference`)
+    anota en `remembered_set` los punteros viejo -> joven (objeto viejo -> destinos jóvenes), así
+    que una colección joven solo recorre la generación joven más esos punteros, sin escanear
+    la generación vieja ni los demás campos de los objetos viejos.
+
+    Con `incremental=True` la colección joven se reparte en pasos de a lo sumo `step_budget`
+    segundos, ejecutados desde `allocate` o desde `idle`. Con `adaptive=True` el umbral de la
+    generación joven y la edad de promoción se ajustan según la tasa de supervivencia medida.
+    """
+    def __init__(self, tracing: bool = False, incremental: bool = False, step_budget: float = 0.0005,
+                 adaptive: bool = False):
         self.young_generation: List[RobotMemoryObject] = []
         self.old_generation: List[RobotMemoryObject] = []
         self.threshold: int = 10  # Número de colecciones sobrevividas antes de la promoción
+        self.young_limit: int = 1000  # Umbral arbitrario
+        self.tracing: bool = tracing
+        self.roots: Set[RobotMemoryObject] = set()
+        self.remembered_set: Dict[RobotMemoryObject, List[RobotMemoryObject]] = {}
+        self.pause_times: Dict[str, deque] = {kind: deque(maxlen=10_000) for kind in ('young', 'full', 'step')}
+        self.survivor_rates: Dict[str, deque] = {kind: deque(maxlen=10_000) for kind in ('young', 'full')}
+        self.promoted: int = 0
+        self._epoch: int = 0
+        # Modo incremental: objetos del ciclo en curso, fase ('roots', 'mark' o 'sweep'), pila gris y cursor
+        self.incremental: bool = incremental
+        self.step_budget: float = step_budget
+        self._cycle: Optional[List[RobotMemoryObject]] = None
+        self._phase: Optional[str] = None
+        self._gray: List[RobotMemoryObject] = []
+        self._cursor: int = 0
+        self._cycle_survivors: int = 0
+        self._cycle_promoted: List[RobotMemoryObject] = []
+        # Modo adaptativo: límites del umbral joven y de la edad de promoción
+        self.adaptive: bool = adaptive
+        self.target_survival: float = 0.2
+        self.young_limit_range: Tuple[int, int] = (1000, 64_000)
+        self.threshold_range: Tuple[int, int] = (1, 15)
 
     def allocate(self, obj: RobotMemoryObject) -> None:
-        """Asigna un nuevo objeto a la generación joven."""
+        """
+        Asigna un nuevo objeto a la generación joven. La colección que dispara la asignación corre
+        antes de anexarlo: el llamador aún no pudo enraizarlo ni enlazarlo, así que el trazado lo
+        daría por muerto.
+        """
+        if self._cycle is not None:
+            self.step()
+        elif len(self.young_generation) >= self.young_limit:
+            if self.incremental:
+                self._start_cycle()
+                self.step()
+            else:
+                self.collect_young()
         self.young_generation.append(obj)
-        if len(self.young_generation) > 1000:  # Umbral arbitrario
-            self.collect_young()
+
+    def idle(self, budget: Optional[float] = None) -> bool:
+        """
+        Hook para tiempos muertos del robot: avanza la colección en curso hasta `budget` segundos
+        (por defecto step_budget). Retorna True si no quedó trabajo pendiente.
+        """
+        if self._cycle is None:
+            return True
+        return self.step(budget)
+
+    def add_root(self, obj: RobotMemoryObject) -> None:
+        """Agrega un objeto al conjunto raíz (estado del robot, pila, registros)."""
+        self.roots.add(obj)
+        if obj.old:
+            self._remember(obj, obj.fields)
+        if self._phase == 'mark':
+            self._gray.append(obj)
+
+    def remove_root(self, obj: RobotMemoryObject) -> None:
+        """Quita un objeto del conjunto raíz."""
+        self.roots.discard(obj)
+
+    def write_reference(self, source: RobotMemoryObject, target: RobotMemoryObject) -> None:
+        """Barrera de escritura: source.fields.append(target), anotando punteros viejo -> joven."""
+        source.fields.append(target)
+        if source.old and not target.old:
+            self.remembered_set.setdefault(source, []).append(target)
+        if self._phase == 'mark' and not target.old:
+            self._gray.append(target)  # barrera incremental: el destino no puede quedar sin marcar
+
+    def remove_reference(self, source: RobotMemoryObject, target: RobotMemoryObject) -> None:
+        """Elimina un puntero (y su entrada en el conjunto recordado, si la tenía)."""
+        source.fields.remove(target)
+        targets = self.remembered_set.get(source)
+        if targets and target in targets:
+            targets.remove(target)
+
+    def clear_references(self, source: RobotMemoryObject) -> None:
+        """Elimina todos los punteros salientes de un objeto."""
+        source.fields.clear()
+        self.remembered_set.pop(source, None)
 
     def collect_young(self) -> None:
         """Realiza una recolección en la generación joven."""
-        survivors = [obj for obj in self.young_generation if obj.is_live()]
+        if self._cycle is not None:
+            self.step(float('inf'))
+            return
+        start = time.perf_counter()
+        total = len(self.young_generation)
+        if self.tracing:
+            survivors = self._trace_young()
+        else:
+            survivors = [obj for obj in self.young_generation if obj.is_live()]
+        self._promote(survivors)
+        self._record('young', start, len(survivors), total)
+
+    def collect_full(self) -> None:
+        """Realiza una recolección completa en ambas generaciones."""
+        if self._cycle is not None:
+            self.step(float('inf'))
+        if not self.tracing:
+            start = time.perf_counter()
+            total = len(self.young_generation) + len(self.old_generation)
+            self.collect_young()
+            self.old_generation = [obj for obj in self.old_generation if obj.is_live()]
+            self._record('full', start, len(self.young_generation) + len(self.old_generation), total)
+            return
+        start = time.perf_counter()
+        total = len(self.young_generation) + len(self.old_generation)
+        epoch = self._mark(list(self.roots), young_only=False)
+        self.old_generation = [obj for obj in self.old_generation if obj.mark == epoch]
+        self.remembered_set = {obj: [target for target in targets if target.mark == epoch]
+                               for obj, targets in self.remembered_set.items() if obj.mark == epoch}
+        self._promote([obj for obj in self.young_generation if obj.mark == epoch])
+        self._record('full', start, len(self.young_generation) + len(self.old_generation), total)
+
+    def _mark(self, stack: List[RobotMemoryObject], young_only: bool) -> int:
+        """Marca con una nueva época todo lo alcanzable desde `stack` (solo objetos jóvenes si young_only)."""
+        self._epoch += 1
+        epoch = self._epoch
+        while stack:
+            obj = stack.pop()
+            if obj.mark == epoch:
+                continue
+            obj.mark = epoch
+            for child in obj.fields:
+                if child.mark != epoch and not (young_only and child.old):
+                    stack.append(child)
+        return epoch
+
+    def _trace_young(self) -> List[RobotMemoryObject]:
+        """Sobrevivientes jóvenes alcanzables desde las raíces o desde el conjunto recordado."""
+        stack = [obj for obj in self.roots if not obj.old]
+        for targets in self.remembered_set.values():
+            stack.extend(targets)
+        epoch = self._mark(stack, young_only=True)
+        return [obj for obj in self.young_generation if obj.mark == epoch]
+
+    def _promote(self, survivors: List[RobotMemoryObject]) -> None:
+        """Envejece a los sobrevivientes y promueve a la generación vieja los que superan el umbral."""
         self.young_generation = []
+        promoted = []
         for obj in survivors:
             obj.age += 1
             if obj.age > self.threshold:
+                obj.old = True
                 self.old_generation.append(obj)
+                promoted.append(obj)
             else:
                 self.young_generation.append(obj)
+        self.promoted += len(promoted)
+        if self.tracing:
+            self._remember_promoted(promoted)
+
+    def _remember_promoted(self, promoted: List[RobotMemoryObject]) -> None:
+        """Anota los punteros salientes de los recién promovidos y quita del conjunto recordado los destinos ya viejos."""
+        for obj in promoted:
+            self._remember(obj, obj.fields)
+        remembered = {}
+        for obj, targets in self.remembered_set.items():
+            young = [target for target in targets if not target.old]
+            if young:
+                remembered[obj] = young
+        self.remembered_set = remembered
+
+    def _remember(self, source: RobotMemoryObject, targets: List[RobotMemoryObject]) -> None:
+        young = [target for target in targets if not target.old]
+        if young:
+            self.remembered_set.setdefault(source, []).extend(young)
+
+    def _record(self, kind: str, start: float, survivors: int, total: int) -> None:
+        self.pause_times[kind].append(time.perf_counter() - start)
+        self.survivor_rates[kind].append(survivors / total if total else 1.0)
+        if self.adaptive and kind == 'young' and total:
+            self._adapt(survivors / total)
+
+    def _adapt(self, survival: float) -> None:
+        """
+        Alta supervivencia: colectar es trabajo perdido, así que se agranda la generación joven y
+        se promueve antes. Baja supervivencia: se achica la generación joven y se promueve más tarde.
+        """
+        (min_limit, max_limit), (min_age, max_age) = self.young_limit_range, self.threshold_range
+        if survival > 2 * self.target_survival:
+            self.young_limit = min(max_limit, self.young_limit * 2)
+            self.threshold = max(min_age, self.threshold - 1)
+        elif survival < self.target_survival / 2:
+            self.young_limit = max(min_limit, self.young_limit // 2)
+            self.threshold = min(max_age, self.threshold + 1)
+
+    def _start_cycle(self) -> None:
+        """
+        Abre un ciclo incremental sobre la generación joven actual. Los objetos asignados durante
+        el ciclo no forman parte de él y sobreviven hasta el siguiente.
+        """
+        self._cycle = self.young_generation
+        self.young_generation = []
+        self._cursor = 0
+        self._cycle_survivors = 0
+        self._cycle_promoted = []
+        if self.tracing:
+            self._epoch += 1
+            self._phase = 'roots'
+        else:
+            self._phase = 'sweep'
+
+    def step(self, budget: Optional[float] = None) -> bool:
+        """
+        Avanza el ciclo incremental durante a lo sumo `budget` segundos (por defecto step_budget).
+        Retorna True si el ciclo terminó.
+        """
+        if self._cycle is None:
+            return True
+        start = time.perf_counter()
+        deadline = start + (self.step_budget if budget is None else budget)
+        epoch = self._epoch
+        work = 0
+        if self._phase == 'roots':
+            self._gray = [obj for obj in self.roots if not obj.old]
+            for targets in self.remembered_set.values():
+                self._gray.extend(targets)
+            self._phase = 'mark'
+        if self._phase == 'mark':
+            gray = self._gray
+            while gray:
+                obj = gray.pop()
+                if obj.mark != epoch:
+                    obj.mark = epoch
+                    for child in obj.fields:
+                        if child.mark != epoch and not child.old:
+                            gray.append(child)
+                work += 1
+                if work & 63 == 0 and time.perf_counter() >= deadline:
+                    break
+            if not gray:
+                self._phase = 'sweep'
+        if self._phase == 'sweep':
+            cycle = self._cycle
+            while self._cursor < len(cycle):
+                obj = cycle[self._cursor]
+                self._cursor += 1
+                if (obj.mark == epoch) if self.tracing else obj.is_live():
+                    self._cycle_survivors += 1
+                    obj.age += 1
+                    if obj.age > self.threshold:
+                        obj.old = True
+                        self.old_generation.append(obj)
+                        self._cycle_promoted.append(obj)
+                    else:
+                        self.young_generation.append(obj)
+                work += 1
+                if work & 63 == 0 and time.perf_counter() >= deadline:
+                    break
+        self.pause_times['step'].append(time.perf_counter() - start)
+        if self._phase == 'sweep' and self._cursor >= len(self._cycle):
+            self._finish_cycle()
+            return True
+        return False
+
+    def _finish_cycle(self) -> None:
+        promoted = self._cycle_promoted
+        self.promoted += len(promoted)
+        if self.tracing:
+            self._remember_promoted(promoted)
+        total = len(self._cycle)
+        self._cycle = None
+        self._phase = None
+        self._gray = []
+        self.survivor_rates['young'].append(self._cycle_survivors / total if total else 1.0)
+        if self.adaptive and total:
+            self._adapt(self._cycle_survivors / total)
+
+    def pause_histogram(self, kinds: Tuple[str, ...] = ('young', 'full', 'step')) -> Dict[str, int]:
+        """Histograma de pausas (en µs) de las colecciones y pasos incrementales registrados."""
+        bounds = (50, 100, 250, 500, 1000, 2500, 5000, 10_000)
+        histogram = {f'<{bound}us': 0 for bound in bounds}
+        histogram[f'>={bounds[-1]}us'] = 0
+        for kind in kinds:
+            for pause in self.pause_times[kind]:
+                micros = pause * 1e6
+                label = next((f'<{bound}us' for bound in bounds if micros < bound), f'>={bounds[-1]}us')
+                histogram[label] += 1
+        return histogram
+
+    def gc_stats(self) -> Dict[str, Any]:
+        """Pausas (media, p99, máx. en segundos) y tasa media de supervivencia por tipo de colección."""
+        stats: Dict[str, Any] = {'promoted': self.promoted,
+                                 'remembered_set': sum(len(targets) for targets in self.remembered_set.values())}
+        for kind, pauses in self.pause_times.items():
+            ordered = sorted(pauses)
+            rates = self.survivor_rates.get(kind, ())  # Los pasos incrementales no tienen supervivencia propia
+            stats[kind] = {
+                'collections': len(ordered),
+                'pause_mean': sum(ordered) / len(ordered) if ordered else 0.0,
+                'pause_p99': percentile(ordered, 0.99),
+                'pause_max': ordered[-1] if ordered else 0.0,
+                'survivor_rate': sum(rates) / len(rates) if rates else 0.0,
+            }
+        return stats
+
+class PooledGenerationalGC(GenerationalGC):
+    """
+    Recolector generacional sobre un heap por columnas: la edad, el contador de referencias y
+    la generación de cada objeto viven en arreglos paralelos (array) y los objetos se
+    identifican por un entero (handle). Las ranuras liberadas se reciclan con una lista libre
+    y, con NumPy, las colecciones son filtros vectorizados sobre las columnas.
+    """
+    def __init__(self):
+        super().__init__()
+        self.ages: array = array('B')
+        self.references: array = array('i')
+        self.generations: array = array('b')
+        self.young_generation: array = array('q')  # handles de la generación joven
+        self.free_slots: array = array('q')
+        self.old_count: int = 0
+
+    def allocate(self, obj: Optional[RobotMemoryObject] = None) -> int:
+        """Reserva una ranura con una referencia y retorna su handle."""
+        if self.free_slots:
+            handle = self.free_slots.pop()
+            self.ages[handle] = 0
+            self.references[handle] = 1
+            self.generations[handle] = SLOT_YOUNG
+        else:
+            handle = len(self.ages)
+            self.ages.append(0)
+            self.references.append(1)
+            self.generations.append(SLOT_YOUNG)
+        self.young_generation.append(handle)
+        if len(self.young_generation) > self.young_limit:
+            self.collect_young()
+        return handle
+
+    def retain(self, handle: int) -> None:
+        """Agrega una referencia al objeto."""
+        self.references[handle] += 1
+
+    def release(self, handle: int) -> None:
+        """Quita una referencia; la ranura se recicla en la siguiente colección de su generación."""
+        self.references[handle] -= 1
+
+    def is_live(self, handle: int) -> bool:
+        """Determina si un objeto está vivo (alcanzable)."""
+        return self.generations[handle] != SLOT_FREE and self.references[handle] > 0
+
+    def live_objects(self) -> int:
+        """Objetos que ocupan una ranura (jóvenes más viejos)."""
+        return len(self.young_generation) + self.old_count
+
+    def collect_young(self) -> None:
+        """Realiza una recolección en la generación joven."""
+        start = time.perf_counter()
+        total = len(self.young_generation)
+        if np is not None:
+            survivors = self._collect_young_vectorized()
+        else:
+            survivors = self._collect_young_python()
+        self._record('young', start, survivors, total)
 
     def collect_full(self) -> None:
         """Realiza una recolección completa en ambas generaciones."""
+        start = time.perf_counter()
+        total = len(self.young_generation) + self.old_count
         self.collect_young()
-        self.old_generation = [obj for obj in self.old_generation if obj.is_live()]
+        if np is not None:
+            generations = np.frombuffer(self.generations, dtype=np.int8)
+            references = np.frombuffer(self.references, dtype=np.int32)
+            dead = np.flatnonzero((generations == SLOT_OLD) & (references <= 0))
+            generations[dead] = SLOT_FREE
+            dead = array('q', dead.astype(np.int64).tobytes())
+        else:
+            dead = [handle for handle, generation in enumerate(self.generations)
+                    if generation == SLOT_OLD and self.references[handle] <= 0]
+            for handle in dead:
+                self.generations[handle] = SLOT_FREE
+        self.free_slots.extend(dead)
+        self.old_count -= len(dead)
+        self._record('full', start, len(self.young_generation) + self.old_count, total)
+
+    def _collect_young_vectorized(self) -> int:
+        handles = np.frombuffer(self.young_generation, dtype=np.int64)
+        ages = np.frombuffer(self.ages, dtype=np.uint8)
+        references = np.frombuffer(self.references, dtype=np.int32)
+        generations = np.frombuffer(self.generations, dtype=np.int8)
+        live = references[handles] > 0
+        dead = handles[~live]
+        generations[dead] = SLOT_FREE
+        self.free_slots.frombytes(dead.tobytes())
+        survivors = handles[live]
+        ages[survivors] = np.minimum(ages[survivors], 254) + 1
+        promote = ages[survivors] > self.threshold
+        generations[survivors[promote]] = SLOT_OLD
+        promoted = int(promote.sum())
+        self.old_count += promoted
+        self.promoted += promoted
+        del handles
+        self.young_generation = array('q', survivors[~promote].tobytes())
+        return len(survivors)
+
+    def _collect_young_python(self) -> int:
+        young = array('q')
+        survivors = 0
+        for handle in self.young_generation:
+            if self.references[handle] <= 0:
+                self.generations[handle] = SLOT_FREE
+                self.free_slots.append(handle)
+                continue
+            survivors += 1
+            self.ages[handle] = min(self.ages[handle], 254) + 1
+            if self.ages[handle] > self.threshold:
+                self.generations[handle] = SLOT_OLD
+                self.old_count += 1
+                self.promoted += 1
+            else:
+                young.append(handle)
+        self.young_generation = young
+        return survivors
 
 class RobotCoordinationSystem:
     """Sistema principal de coordinación de robots."""
-    def __init__(self, num_robots: int):
+    def __init__(self, num_robots: int, event_log: bool = False):
         self.robots: List[Robot] = [Robot(i, num_robots) for i in range(num_robots)]
         self.raymond_trees: Dict[str, RaymondTree] = {}
-        self.snapshots: Dict[int, ChandyLamportSnapshot] = {}
+        self.resource_usage: Dict[str, Counter] = defaultdict(Counter)  # solicitudes por robot
         self.gc: GenerationalGC = GenerationalGC()
+        self.message_bus: Optional[MessageBus] = None
+        self.mutexes: Dict[str, RaymondMutex] = {}
+        self.lock_manager: Optional[LockManager] = None
+        self.snapshot_engine: SnapshotEngine = SnapshotEngine(self.robots)
+        # Registro causal opcional: estampar cada operación copia un reloj de N componentes y el
+        # registro solo crece, así que por defecto no se paga en la ruta de bloqueo
+        self.event_log: Optional[CausalEventLog] = None
+        if event_log:
+            self.enable_event_log()
+        self._marker_clocks: Dict[Tuple[int, int], List[int]] = {}  # (robot, instantánea) -> reloj del envío
+        self._log_lock = threading.Lock()
+        # Protege raymond_trees, resource_usage y los nodos de los árboles: main() y el gestor de
+        # bloqueos los crean, consultan y modifican desde varios hilos
+        self._tree_lock = threading.RLock()
 
-    def init_raymond_tree(self, resource_id: str) -> None:
-        """Inicializa un árbol de Raymond para un recurso específico."""
-        root = RaymondTree(0)
-        self.raymond_trees[resource_id] = root
-        for i in range(1, len(self.robots)):
-            node = RaymondTree(i, parent=root)
-            root.children.append(node)
+    def init_raymond_tree(self, resource_id: str, strategy: str = 'star', root: int = 0, arity: int = 2,
+                          distances: Optional[List[List[float]]] = None) -> RaymondTree:
+        """
+        Inicializa un árbol de Raymond para un recurso específico. Estrategias:
+        'star' (todos cuelgan de `root`), 'kary' (árbol k-ario balanceado de grado `arity`),
+        'mst' (árbol de expansión mínima sobre la matriz de latencias `distances`) y
+        'usage' (k-ario con los robots que más usan el recurso más cerca de la raíz).
+        """
+        with self._tree_lock:
+            robot_ids = [robot.id for robot in self.robots]
+            if strategy == 'star':
+                parents = {i: root for i in robot_ids if i != root}
+            elif strategy == 'kary':
+                order = [root] + [i for i in robot_ids if i != root]
+                parents = self._kary_parents(order, arity)
+            elif strategy == 'usage':
+                usage = self.resource_usage[resource_id]
+                order = sorted(robot_ids, key=lambda i: (-usage[i], i))
+                root = order[0]
+                parents = self._kary_parents(order, arity)
+            elif strategy == 'mst':
+                if distances is None:
+                    raise ValueError("La estrategia 'mst' requiere una matriz de distancias")
+                parents = self._mst_parents(robot_ids, root, distances)
+            else:
+                raise ValueError(f"Estrategia de árbol desconocida: {strategy}")
+
+            nodes = {i: RaymondTree(i) for i in robot_ids}
+            for robot_id in robot_ids:  # orden de ids para que los hijos queden ordenados
+                if robot_id in parents:
+                    nodes[parents[robot_id]].add_child(nodes[robot_id])
+            self.raymond_trees[resource_id] = nodes[root]
+            return nodes[root]
+
+    @staticmethod
+    def _kary_parents(order: List[int], arity: int) -> Dict[int, int]:
+        """Padres de un árbol k-ario completo que recorre `order` por niveles."""
+        return {order[i]: order[(i - 1) // arity] for i in range(1, len(order))}
+
+    @staticmethod
+    def _mst_parents(robot_ids: List[int], root: int, distances: List[List[float]]) -> Dict[int, int]:
+        """Padres del árbol de expansión mínima (Prim) enraizado en `root`."""
+        best = {i: (distances[root][i], root) for i in robot_ids if i != root}
+        parents: Dict[int, int] = {}
+        while best:
+            robot_id = min(best, key=lambda i: best[i][0])
+            parents[robot_id] = best.pop(robot_id)[1]
+            for other, (cost, _) in best.items():
+                if distances[robot_id][other] < cost:
+                    best[other] = (distances[robot_id][other], robot_id)
+        return parents
+
+    def reroot_raymond_tree(self, resource_id: str, robot_id: Optional[int] = None) -> RaymondTree:
+        """
+        Re-enraiza el árbol de un recurso en `robot_id` o, si no se indica, en el robot que más
+        lo ha solicitado. La forma del árbol no cambia, solo la orientación de los enlaces.
+        """
+        with self._tree_lock:
+            tree = self.raymond_trees[resource_id]
+            if robot_id is None:
+                usage = self.resource_usage[resource_id]
+                if not usage:
+                    return tree
+                robot_id = min(usage, key=lambda i: (-usage[i], i))
+            root = tree.find_node(robot_id).make_root()
+            self.raymond_trees[resource_id] = root
+            return root
+
+    def get_raymond_tree(self, resource_id: str, **tree_options: Any) -> RaymondTree:
+        """Retorna el árbol de un recurso, creándolo con `tree_options` si aún no existe."""
+        with self._tree_lock:
+            tree = self.raymond_trees.get(resource_id)
+            if tree is None:
+                tree = self.init_raymond_tree(resource_id, **tree_options)
+            return tree
+
+    def start_mutex(self, resource_id: str) -> RaymondMutex:
+        """
+        Arranca el motor de Raymond por paso de mensajes para un recurso (crea el árbol en
+        estrella si no existe). El árbol no debe re-enraizarse mientras el motor está activo.
+        """
+        tree = self.get_raymond_tree(resource_id)
+        if self.message_bus is None:
+            self.message_bus = MessageBus()
+        mutex = RaymondMutex(resource_id, tree, self.message_bus, self)
+        self.mutexes[resource_id] = mutex
+        return mutex
+
+    def start_lock_manager(self, num_shards: int = 4, **tree_options: Any) -> LockManager:
+        """Crea el gestor de bloqueos multi-recurso, seguro para usar desde varios hilos."""
+        if self.lock_manager is None:
+            self.lock_manager = LockManager(self, num_shards, **tree_options)
+        return self.lock_manager
+
+    def stop_mutexes(self) -> None:
+        """Detiene el bus de mensajes de los motores de Raymond."""
+        if self.message_bus is not None:
+            self.message_bus.close()
+            self.message_bus = None
+        self.mutexes.clear()
+        if self.lock_manager is not None:
+            self.lock_manager.close()
+            self.lock_manager = None
+
+    def enable_event_log(self) -> 'CausalEventLog':
+        """Activa el registro causal de solicitudes, liberaciones, token y marcadores desde este punto."""
+        if self.event_log is None:
+            self.event_log = CausalEventLog(len(self.robots))
+        return self.event_log
+
+    def log_event(self, robot_id: int, kind: str, data: Any = None,
+                  received_clock: Optional[List[int]] = None) -> 'Event':
+        """
+        Registra un evento del robot con su reloj vectorial: un evento local incrementa el reloj y
+        una recepción lo mezcla con `received_clock` (el reloj con que se estampó el envío).
+        Requiere el registro activo (`event_log=True` o `enable_event_log()`).
+        """
+        if self.event_log is None:
+            raise ValueError("El registro causal no está activo; use event_log=True o enable_event_log()")
+        with self._log_lock:
+            clock = self.robots[robot_id].vector_clock
+            if received_clock is None:
+                clock.increment()
+            else:
+                clock.update(received_clock)
+            return self.event_log.append(Event(list(clock.clock), robot_id, kind, data))
 
     def request_resource(self, robot_id: int, resource_id: str) -> bool:
         """Solicita un recurso para un robot específico."""
-        tree = self.raymond_trees[resource_id]
-        node = tree.find_node(robot_id)
-        result = node.request_resource(robot_id)
-        if not result and node.parent:
-            self.send_request(node.parent.robot_id, resource_id)
-        return result
+        with self._tree_lock:
+            self.resource_usage[resource_id][robot_id] += 1
+            if self.event_log is not None:
+                self.log_event(robot_id, 'request', resource_id)
+            tree = self.raymond_trees[resource_id]
+            node = tree.find_node(robot_id)
+            result = node.request_resource(robot_id)
+            if not result and node.parent:
+                self.send_request(node.parent.robot_id, resource_id)
+            return result
 
     def send_request(self, to_robot_id: int, resource_id: str) -> None:
         """Envía una solicitud de recurso a otro robot."""
@@ -170,41 +1279,81 @@ class RobotCoordinationSystem:
 
     def release_resource(self, robot_id: int, resource_id: str) -> None:
         """Libera un recurso previamente adquirido por un robot."""
-        tree = self.raymond_trees[resource_id]
-        node = tree.find_node(robot_id)
-        result = node.release_resource(robot_id)
-        if result:
-            self.send_token(result[0], result[1], resource_id)
+        with self._tree_lock:
+            if self.event_log is not None:
+                self.log_event(robot_id, 'release', resource_id)
+            tree = self.raymond_trees[resource_id]
+            node = tree.find_node(robot_id)
+            result = node.release_resource(robot_id)
+            if result:
+                self.send_token(result[0], result[1], resource_id)
 
     def send_token(self, to_robot_id: int, from_robot_id: int, resource_id: str) -> None:
         """Envía el token de un recurso a otro robot."""
+        if self.event_log is not None:
+            sent = self.log_event(from_robot_id, 'token_sent', resource_id)
+            self.log_event(to_robot_id, 'token_received', resource_id, received_clock=sent.vector_clock)
         print(f"Token for resource {resource_id} sent from robot {from_robot_id} to robot {to_robot_id}")
 
-    def initiate_snapshot(self, initiator_id: int) -> None:
-        """Inicia el proceso de toma de instantánea global."""
-        snapshot = ChandyLamportSnapshot(len(self.robots))
-        self.snapshots[initiator_id] = snapshot
-        self.record_local_state(initiator_id)
-        self.send_marker(initiator_id)
+    @property
+    def snapshots(self) -> Dict[int, ChandyLamportSnapshot]:
+        """Instantáneas del motor, por id de instantánea."""
+        return self.snapshot_engine.snapshots
 
-    def record_local_state(self, robot_id: int) -> None:
-        """Registra el estado local de un robot en una instantánea."""
-        snapshot = self.snapshots[robot_id]
-        snapshot.record_state(robot_id, self.robots[robot_id].state)
+    def initiate_snapshot(self, initiator_id: int) -> int:
+        """Inicia una instantánea global en `snapshot_engine` y retorna su id."""
+        snapshot_id = self.snapshot_engine.initiate_snapshot(initiator_id)
+        self.send_marker(initiator_id, snapshot_id)
+        return snapshot_id
 
-    def send_marker(self, from_robot_id: int) -> None:
-        """Envía marcadores a todos los otros robots para iniciar la instantánea."""
+    def send_marker(self, from_robot_id: int, snapshot_id: int) -> None:
+        """
+        Anota los marcadores que el motor encoló hacia los demás robots al registrar el estado de
+        `from_robot_id` en la instantánea `snapshot_id`.
+        """
+        if self.event_log is not None:
+            self._marker_clocks[(from_robot_id, snapshot_id)] = self.log_event(
+                from_robot_id, 'marker_sent', snapshot_id).vector_clock
         for robot in self.robots:
             if robot.id != from_robot_id:
                 print(f"Marker sent from robot {from_robot_id} to robot {robot.id}")
 
-    def receive_marker(self, from_robot_id: int, to_robot_id: int) -> None:
-        """Procesa la recepción de un marcador en el algoritmo de instantánea."""
-        if to_robot_id not in self.snapshots:
-            self.snapshots[to_robot_id] = ChandyLamportSnapshot(len(self.robots))
-            self.record_local_state(to_robot_id)
-            self.send_marker(to_robot_id)
-        print(f"Marker received from robot {from_robot_id} to robot {to_robot_id}")
+    def receive_marker(self, from_robot_id: int, to_robot_id: int) -> Optional[int]:
+        """
+        Entrega el canal from_robot_id -> to_robot_id hasta su siguiente marcador inclusive (los
+        mensajes previos se graban en las instantáneas que aún escuchan el canal). Si es el primer
+        marcador de esa instantánea para el destino, este registra su estado y reenvía marcadores.
+        Retorna el id de la instantánea, o None si el canal no tenía marcadores.
+        """
+        engine = self.snapshot_engine
+        channel = engine.channels.get((from_robot_id, to_robot_id))
+        while channel:
+            is_marker, snapshot_id = channel[0]
+            if not is_marker:
+                engine.deliver(from_robot_id, to_robot_id)
+                continue
+            first = to_robot_id not in engine.snapshots[snapshot_id].open_channels
+            if self.event_log is not None:
+                self.log_event(to_robot_id, 'marker_received', snapshot_id,
+                               received_clock=self._marker_clocks.get((from_robot_id, snapshot_id)))
+            engine.deliver(from_robot_id, to_robot_id)
+            print(f"Marker received from robot {from_robot_id} to robot {to_robot_id}")
+            if first:
+                self.send_marker(to_robot_id, snapshot_id)
+            return snapshot_id
+        return None
+
+    def complete_snapshots(self) -> int:
+        """Entrega marcadores por turnos hasta completar las instantáneas en curso; retorna cuántos entregó."""
+        engine = self.snapshot_engine
+        received = 0
+        while engine.active:
+            busy = [pair for pair, channel in engine.channels.items() if channel]
+            if not busy:
+                break
+            for from_robot_id, to_robot_id in busy:
+                received += self.receive_marker(from_robot_id, to_robot_id) is not None
+        return received
 
     def detect_causal_violations(self, event1: 'Event', event2: 'Event') -> bool:
         """
@@ -217,10 +1366,171 @@ class RobotCoordinationSystem:
             return False  # No hay violación de causalidad
         return True  # Posible violación de causalidad
 
+    @staticmethod
+    def _causal_chunks(clocks, chunk_elements: int):
+        """
+        Genera (inicio, le, ge) por bloques de filas: le[a, j] indica clocks[inicio + a] <= clocks[j]
+        componente a componente y ge[a, j] lo contrario. Se compara un proceso a la vez acumulando
+        en sitio, de modo que cada bloque usa como máximo `chunk_elements` comparaciones.
+        """
+        columns = np.ascontiguousarray(np.asarray(clocks).T)
+        k, n = columns.shape
+        rows = max(1, chunk_elements // max(1, n * k))
+        for start in range(0, n, rows):
+            block = columns[:, start:start + rows, None]
+            le = block[0] <= columns[0]
+            ge = block[0] >= columns[0]
+            for p in range(1, k):
+                le &= block[p] <= columns[p]
+                ge &= block[p] >= columns[p]
+            yield start, le, ge
+
+    def causal_order_matrix(self, clocks, chunk_elements: int = CAUSAL_CHUNK_ELEMENTS):
+        """
+        Calcula la relación causal entre todos los pares de eventos a partir de una matriz
+        (eventos x procesos) de relojes vectoriales. Retorna una matriz n x n con los códigos
+        HAPPENED_BEFORE, HAPPENED_AFTER, CONCURRENT e IDENTICAL.
+        """
+        if np is None:
+            return [[self._causal_order(a, b) for b in clocks] for a in clocks]
+        clocks = np.asarray(clocks)
+        order = np.zeros((len(clocks), len(clocks)), dtype=np.int8)
+        for start, le, ge in self._causal_chunks(clocks, chunk_elements):
+            block = order[start:start + len(le)]
+            block[le & ~ge] = HAPPENED_BEFORE
+            block[ge & ~le] = HAPPENED_AFTER
+            block[le & ge] = IDENTICAL
+        return order
+
+    def causal_violation_matrix(self, clocks, chunk_elements: int = CAUSAL_CHUNK_ELEMENTS):
+        """
+        Versión masiva de detect_causal_violations: violations[i][j] (con i < j) es True cuando el
+        evento i no ocurrió antes que el j. La diagonal y el triángulo inferior quedan en False.
+        """
+        order = self.causal_order_matrix(clocks, chunk_elements)
+        if np is None:
+            return [[i < j and order[i][j] != HAPPENED_BEFORE for j in range(len(order))]
+                    for i in range(len(order))]
+        return np.triu(order != HAPPENED_BEFORE, k=1)
+
+    def find_causal_violations(self, clocks,
+                               chunk_elements: int = CAUSAL_CHUNK_ELEMENTS) -> List[Tuple[int, int]]:
+        """
+        Retorna la lista dispersa de pares (i, j), i < j, con violación de causalidad, en el mismo
+        orden que el doble bucle sobre detect_causal_violations, sin construir la matriz n x n.
+        """
+        if np is None:
+            return [(i, j) for i in range(len(clocks)) for j in range(i + 1, len(clocks))
+                    if self._causal_order(clocks[i], clocks[j]) != HAPPENED_BEFORE]
+        pairs = []
+        for start, le, ge in self._causal_chunks(clocks, chunk_elements):
+            violations = ~(le & ~ge)
+            rows = np.arange(start, start + len(le))[:, None]
+            violations &= rows < np.arange(violations.shape[1])[None, :]
+            i, j = np.nonzero(violations)
+            pairs.extend(zip((i + start).tolist(), j.tolist()))
+        return pairs
+
+    @staticmethod
+    def _causal_order(clock1: List[int], clock2: List[int]) -> int:
+        """Relación causal entre dos relojes, con los mismos códigos que causal_order_matrix."""
+        le = all(a <= b for a, b in zip(clock1, clock2))
+        ge = all(a >= b for a, b in zip(clock1, clock2))
+        if le and ge:
+            return IDENTICAL
+        if le:
+            return HAPPENED_BEFORE
+        if ge:
+            return HAPPENED_AFTER
+        return CONCURRENT
+
 class Event:
     """Representa un evento con un reloj vectorial."""
-    def __init__(self, vector_clock: List[int]):
+    def __init__(self, vector_clock: List[int], robot_id: Optional[int] = None,
+                 kind: Optional[str] = None, data: Any = None):
         self.vector_clock = vector_clock
+        self.robot_id = robot_id
+        self.kind = kind
+        self.data = data
+        self.index: Optional[int] = None  # posición en el CausalEventLog
+
+    def __repr__(self) -> str:
+        return f"Event({self.kind!r}, robot={self.robot_id}, clock={self.vector_clock})"
+
+_BY_INDEX = attrgetter('index')
+
+class CausalEventLog:
+    """
+    Registro de eventos de solo anexado con índices por robot. Los eventos de un mismo robot
+    tienen relojes monótonos en cada componente, así que las consultas causales se resuelven
+    con búsqueda binaria sobre la lista de cada robot: O(N log n) más el tamaño del resultado,
+    en lugar de comparar contra todo el registro.
+    """
+    def __init__(self, num_processes: int):
+        self.events: List[Event] = []
+        self.by_robot: List[List[Event]] = [[] for _ in range(num_processes)]
+
+    def append(self, event: Event) -> Event:
+        """Anexa un evento; su reloj no puede retroceder respecto al evento anterior del robot."""
+        own = self.by_robot[event.robot_id]
+        if own and event.vector_clock[event.robot_id] <= own[-1].vector_clock[event.robot_id]:
+            raise ValueError(f"El reloj del robot {event.robot_id} no avanzó: {event.vector_clock}")
+        event.index = len(self.events)
+        self.events.append(event)
+        own.append(event)
+        return event
+
+    @staticmethod
+    def happened_before(first: Event, second: Event) -> bool:
+        """first -> second en O(1): basta comparar el componente del robot de `first`."""
+        owner = first.robot_id
+        return first is not second and first.vector_clock[owner] <= second.vector_clock[owner]
+
+    def predecessors(self, event: Event) -> List[Event]:
+        """Eventos que ocurrieron antes que `event` (sus predecesores causales)."""
+        result = []
+        for robot_id, own in enumerate(self.by_robot):
+            end = self._predecessor_end(robot_id, event)
+            result.extend(own[:end - 1] if robot_id == event.robot_id else own[:end])
+        return sorted(result, key=_BY_INDEX)
+
+    def successors(self, event: Event) -> List[Event]:
+        """Eventos que ocurrieron después de `event`."""
+        result = []
+        for robot_id, own in enumerate(self.by_robot):
+            start = self._successor_start(robot_id, event)
+            result.extend(own[start + 1:] if robot_id == event.robot_id else own[start:])
+        return sorted(result, key=_BY_INDEX)
+
+    def concurrent_with(self, event: Event) -> List[Event]:
+        """Eventos concurrentes con `event`: ni predecesores ni sucesores."""
+        result = []
+        for robot_id, own in enumerate(self.by_robot):
+            start = self._predecessor_end(robot_id, event)
+            end = self._successor_start(robot_id, event)
+            result.extend(own[start:end])
+        return sorted(result, key=_BY_INDEX)
+
+    def between(self, robot_id: int, lower: List[int], upper: List[int]) -> List[Event]:
+        """Eventos del robot cuyo reloj cumple lower <= reloj <= upper componente a componente."""
+        own = self.by_robot[robot_id]
+        start, end = 0, len(own)
+        for component in range(len(lower)):
+            key = lambda e, c=component: e.vector_clock[c]
+            start = max(start, bisect_left(own, lower[component], key=key))
+            end = min(end, bisect_right(own, upper[component], key=key))
+        return own[start:end]
+
+    def _predecessor_end(self, robot_id: int, event: Event) -> int:
+        # e (del robot r) -> event si e.reloj[r] <= event.reloj[r]
+        return bisect_right(self.by_robot[robot_id], event.vector_clock[robot_id],
+                            key=lambda e: e.vector_clock[robot_id])
+
+    def _successor_start(self, robot_id: int, event: Event) -> int:
+        # event -> e si e.reloj[p] >= event.reloj[p], con p el robot de event
+        owner = event.robot_id
+        return bisect_left(self.by_robot[robot_id], event.vector_clock[owner],
+                           key=lambda e: e.vector_clock[owner])
 
 def main():
     system = RobotCoordinationSystem(5)  # 5 robots
@@ -239,6 +1549,9 @@ def main():
         # Esperar a que todas las tareas se completen
         concurrent.futures.wait(futures)
 
+    # Entrega los marcadores hasta que la instantánea se completa
+    system.complete_snapshots()
+
     # Simula algunos eventos
     events = [
         Event(vector_clock=[1, 0, 0, 0, 0]),
@@ -248,11 +1561,9 @@ def main():
         Event(vector_clock=[1, 1, 1, 0, 0])
     ]
 
-    for i in range(len(events)):
-        for j in range(i + 1, len(events)):
-            violation = system.detect_causal_violations(events[i], events[j])
-            if violation:
-                print(f"Causal violation detected between event {i + 1} and event {j + 1}")
+    # Detección masiva de violaciones de causalidad sobre todos los pares de eventos
+    for i, j in system.find_causal_violations([event.vector_clock for event in events]):
+        print(f"Causal violation detected between event {i + 1} and event {j + 1}")
 
     # Ejemplo de GC
     for _ in range(1000):
@@ -0,0 +1,52 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark de detección de violaciones de causalidad: doble bucle sobre detect_causal_violations
+# frente a la API masiva vectorizada (find_causal_violations) sobre relojes vectoriales aleatorios.
+
+def random_clocks(num_events, num_robots, rng):
+    """
+    Genera relojes de eventos de una ejecución simulada: cada robot avanza su componente y a veces
+    se sincroniza con el reloj de otro robot (recepción de mensaje).
+    """
+    clocks = [[0] * num_robots for _ in range(num_robots)]
+    events = []
+    for _ in range(num_events):
+        robot = rng.randrange(num_robots)
+        if rng.random() < 0.3:
+            other = clocks[rng.randrange(num_robots)]
+            clocks[robot] = [max(a, b) for a, b in zip(clocks[robot], other)]
+        clocks[robot][robot] += 1
+        events.append(list(clocks[robot]))
+    return events
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    if module.np is None:
+        print('numpy is not installed: the bulk API falls back to pure Python')
+    system = module.RobotCoordinationSystem(16)
+    rng = random.Random(42)
+    sizes = (500, 2_000, 10_000, 20_000) if module.np is not None else (500, 2_000)
+    for num_events in sizes:
+        clocks = random_clocks(num_events, 16, rng)
+        start = time.perf_counter()
+        pairs = system.find_causal_violations(clocks)
+        bulk = time.perf_counter() - start
+        line = f"{num_events:6d} events  bulk={bulk * 1000:10.1f} ms  violations={len(pairs)}"
+        if num_events <= 2_000:
+            events = [module.Event(clock) for clock in clocks]
+            start = time.perf_counter()
+            count = sum(system.detect_causal_violations(events[i], events[j])
+                        for i in range(num_events) for j in range(i + 1, num_events))
+            pairwise = time.perf_counter() - start
+            assert count == len(pairs)
+            line += f"  pairwise={pairwise * 1000:10.1f} ms  speedup={pairwise / bulk:6.1f}x"
+        print(line)
+
+if __name__ == '__main__':
+    main()
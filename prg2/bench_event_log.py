@@ -0,0 +1,69 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark del registro causal: 16 robots generan 10^4 a 10^5 eventos (locales, envíos y
+# recepciones estampados con log_event). Compara las consultas indexadas (predecesores,
+# concurrentes, eventos de un robot entre dos relojes) contra recorrer todo el registro.
+
+def build_log(module, num_robots, num_events, rng):
+    system = module.RobotCoordinationSystem(num_robots, event_log=True)
+    in_flight = []
+    while len(system.event_log.events) < num_events:
+        robot_id = rng.randrange(num_robots)
+        draw = rng.random()
+        if draw < 0.3 and in_flight:
+            sender, receiver, clock = in_flight.pop(rng.randrange(len(in_flight)))
+            system.log_event(receiver, 'receive', sender, received_clock=clock)
+        elif draw < 0.6:
+            receiver = rng.randrange(num_robots)
+            sent = system.log_event(robot_id, 'send', receiver)
+            in_flight.append((robot_id, receiver, sent.vector_clock))
+        else:
+            system.log_event(robot_id, 'local')
+    return system.event_log
+
+def scan_concurrent(log, event):
+    before, after = log.happened_before, log.happened_before
+    return [e for e in log.events if e is not event and not before(e, event) and not after(event, e)]
+
+def scan_between(log, robot_id, lower, upper):
+    return [e for e in log.events if e.robot_id == robot_id
+            and all(a <= c <= b for a, c, b in zip(lower, e.vector_clock, upper))]
+
+def timed(function, queries):
+    start = time.perf_counter()
+    results = [function(*query) for query in queries]
+    return (time.perf_counter() - start) / len(queries), results
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    rng = random.Random(4)
+    for num_events in (10_000, 100_000):
+        log = build_log(module, 16, num_events, rng)
+        events = rng.sample(log.events, 50)
+        windows = []
+        for event in events:
+            lower = [max(0, value - 20) for value in event.vector_clock]
+            upper = [value + 20 for value in event.vector_clock]
+            windows.append((event.robot_id, lower, upper))
+        rows = [
+            ('predecessors', lambda e: log.predecessors(e),
+             lambda e: [x for x in log.events if log.happened_before(x, e)], [(e,) for e in events]),
+            ('concurrent', lambda e: log.concurrent_with(e), lambda e: scan_concurrent(log, e), [(e,) for e in events]),
+            ('between', log.between, lambda *w: scan_between(log, *w), windows),
+        ]
+        for name, indexed, scan, queries in rows:
+            indexed_time, indexed_results = timed(indexed, queries)
+            scan_time, scan_results = timed(scan, queries)
+            assert indexed_results == scan_results
+            size = sum(len(result) for result in indexed_results) / len(queries)
+            print(f"{num_events:6d} events  {name:12s} indexed={indexed_time * 1e6:9.1f} us  "
+                  f"scan={scan_time * 1e6:9.1f} us  results={size:8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark del recolector generacional con trazado: robots que asignan muchos mensajes de vida
+# corta, algunos en un búfer temporal y unos pocos enganchados a un mapa de larga vida (punteros
+# viejo -> joven). Compara colecciones jóvenes con conjunto recordado contra trazar todo el heap
+# en cada colección (lo que haría falta sin conjunto recordado), con 10^5 y 10^6 asignaciones.
+
+def workload(module, gc, num_allocations, num_robots, rng):
+    """
+    Cada robot tiene una raíz con un mapa de larga vida y un búfer que se vacía cada 50 mensajes.
+    """
+    roots, maps, buffers = [], [], []
+    for _ in range(num_robots):
+        root, world_map, buffer = module.RobotMemoryObject(), module.RobotMemoryObject(), module.RobotMemoryObject()
+        for obj in (root, world_map, buffer):
+            gc.allocate(obj)
+        gc.write_reference(root, world_map)
+        gc.write_reference(root, buffer)
+        gc.add_root(root)
+        roots.append(root)
+        maps.append(world_map)
+        buffers.append(buffer)
+    for step in range(num_allocations):
+        robot = step % num_robots
+        message = module.RobotMemoryObject()
+        gc.allocate(message)
+        draw = rng.random()
+        if draw < 0.01:
+            gc.write_reference(maps[robot], message)  # el mapa ya es viejo: puntero viejo -> joven
+        elif draw < 0.10:
+            gc.write_reference(buffers[robot], message)
+        if step % (50 * num_robots) == robot:
+            gc.clear_references(buffers[robot])
+    return roots
+
+def check_heap(gc, roots):
+    """
+    Todo objeto alcanzable desde las raíces debe seguir en alguna generación; si no, una
+    colección lo barrió (p. ej. la que disparó su propia asignación) y el heap quedó roto.
+    """
+    tracked = {id(obj) for obj in gc.young_generation}
+    tracked.update(id(obj) for obj in gc.old_generation)
+    stack, seen = list(roots), set()
+    while stack:
+        obj = stack.pop()
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            stack.extend(obj.fields)
+    lost = len(seen - tracked)
+    assert not lost, f"{lost} reachable objects are not tracked by the heap"
+
+def run(module, num_allocations, remembered_set):
+    gc = module.GenerationalGC(tracing=True)
+    if not remembered_set:
+        gc.collect_young = gc.collect_full
+    start = time.perf_counter()
+    roots = workload(module, gc, num_allocations, 16, random.Random(5))
+    elapsed = time.perf_counter() - start
+    check_heap(gc, roots)
+    stats = gc.gc_stats()
+    pauses = stats['full'] if not remembered_set else stats['young']
+    return elapsed, pauses, stats, len(gc.old_generation)
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    for num_allocations in (100_000, 1_000_000):
+        for remembered_set in (True, False):
+            elapsed, pauses, stats, old = run(module, num_allocations, remembered_set)
+            name = 'remembered set' if remembered_set else 'full trace'
+            print(f"{num_allocations:8d} allocs  {name:14s} total={elapsed:6.2f} s  "
+                  f"collections={pauses['collections']:5d}  pause mean={pauses['pause_mean'] * 1000:6.2f} ms  "
+                  f"p99={pauses['pause_p99'] * 1000:6.2f} ms  max={pauses['pause_max'] * 1000:6.2f} ms  "
+                  f"survivors={pauses['survivor_rate']:5.1%}  old={old:6d}  remembered={stats['remembered_set']}")
+
+if __name__ == '__main__':
+    main()
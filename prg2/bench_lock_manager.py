@@ -0,0 +1,57 @@
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark del gestor de bloqueos multi-recurso: hilos de robots adquieren lotes aleatorios
+# de 1 a 3 recursos (en el orden global, sin interbloqueos) con 1 a 8 fragmentos. Reporta lotes
+# por segundo y, para la última configuración, las estadísticas de contención por fragmento.
+
+def run(module, num_shards, num_robots, num_resources, batches_per_robot):
+    """
+    Ejecuta la carga y retorna (lotes por segundo, estadísticas por fragmento).
+    """
+    system = module.RobotCoordinationSystem(num_robots)
+    manager = system.start_lock_manager(num_shards, strategy='kary', arity=4)
+    resources = [f'resource{i}' for i in range(num_resources)]
+    counters = dict.fromkeys(resources, 0)
+
+    def robot(robot_id):
+        rng = random.Random(robot_id)
+        for _ in range(batches_per_robot):
+            batch = rng.sample(resources, rng.randint(1, 3))
+            with manager.locked(robot_id, *batch):
+                for resource_id in batch:
+                    value = counters[resource_id]
+                    time.sleep(0)  # cede el GIL dentro de la sección crítica
+                    counters[resource_id] = value + 1
+
+    threads = [threading.Thread(target=robot, args=(i,)) for i in range(num_robots)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = manager.shard_stats()
+    system.stop_mutexes()
+    assert sum(counters.values()) == sum(shard['entries'] for shard in stats)
+    return num_robots * batches_per_robot / elapsed, stats
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    for num_shards in (1, 2, 4, 8):
+        rate, stats = run(module, num_shards, num_robots=16, num_resources=32, batches_per_robot=300)
+        print(f"{num_shards} shards  batches/s={rate:8.0f}  "
+              f"max messages/shard={max(shard['messages'] for shard in stats):7d}")
+    for shard in stats:
+        print(f"  shard {shard['shard']}: resources={shard['resources']:2d}  entries={shard['entries']:5d}  "
+              f"contention={shard['contention']:6.1%}  messages={shard['messages']:6d}  "
+              f"wait mean={shard['wait_mean'] * 1000:6.2f} ms  p99={shard['wait_p99'] * 1000:6.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark del heap por columnas (PooledGenerationalGC) frente a la lista de RobotMemoryObject
+# (GenerationalGC): memoria por objeto, tiempo de una colección joven con el 10% de
+# sobrevivientes y rendimiento de un ciclo de asignación con reciclaje de ranuras.
+
+def fill(module, pooled, count):
+    """
+    Asigna `count` objetos sin colecciones intermedias; retorna el gc y los objetos/handles.
+    """
+    gc = module.PooledGenerationalGC() if pooled else module.GenerationalGC()
+    gc.young_limit = count + 1
+    if pooled:
+        items = [gc.allocate() for _ in range(count)]
+    else:
+        items = [module.RobotMemoryObject() for _ in range(count)]
+        for obj in items:
+            gc.allocate(obj)
+    return gc, items
+
+def memory_per_object(module, pooled, count):
+    tracemalloc.start()
+    gc, items = fill(module, pooled, count)
+    del items  # el gc mantiene los objetos (o las ranuras)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / count
+
+def collection_time(module, pooled, count, rng):
+    gc, items = fill(module, pooled, count)
+    for index in range(count):
+        if rng.random() >= 0.1:
+            if pooled:
+                gc.release(items[index])
+            else:
+                items[index].references = 0
+    start = time.perf_counter()
+    gc.collect_young()
+    return time.perf_counter() - start
+
+def churn(module, pooled, count, rng):
+    """
+    Asigna `count` objetos de vida corta (el 95% muere antes de la colección) con colecciones automáticas.
+    """
+    gc = module.PooledGenerationalGC() if pooled else module.GenerationalGC()
+    start = time.perf_counter()
+    for _ in range(count):
+        if pooled:
+            handle = gc.allocate()
+            if rng.random() < 0.95:
+                gc.release(handle)
+        else:
+            obj = module.RobotMemoryObject()
+            gc.allocate(obj)
+            if rng.random() < 0.95:
+                obj.references = 0
+    return count / (time.perf_counter() - start)
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    rng = random.Random(9)
+    for count in (100_000, 1_000_000):
+        for pooled in (False, True):
+            name = 'columns' if pooled else 'objects'
+            memory = memory_per_object(module, pooled, count)
+            collect = collection_time(module, pooled, count, rng)
+            rate = churn(module, pooled, count, rng)
+            print(f"{count:8d} {name:8s} bytes/object={memory:6.1f}  young collection={collect * 1000:7.1f} ms  "
+                  f"alloc churn={rate:9.0f}/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark del motor de Raymond por paso de mensajes: cada robot es un hilo que entra
+# repetidamente en la sección crítica. Reporta secciones críticas por segundo, mensajes por
+# entrada y latencia de espera, y comprueba la exclusión mutua con un contador no atómico.
+
+def run(module, num_robots, entries_per_robot, **tree_options):
+    """
+    Lanza un hilo por robot y retorna las estadísticas del motor al terminar.
+    """
+    system = module.RobotCoordinationSystem(num_robots)
+    system.init_raymond_tree('resource1', **tree_options)
+    mutex = system.start_mutex('resource1')
+    shared = {'counter': 0}
+
+    def robot(robot_id):
+        for _ in range(entries_per_robot):
+            with mutex.locked(robot_id):
+                value = shared['counter']
+                time.sleep(0)  # cede el GIL dentro de la sección crítica
+                shared['counter'] = value + 1
+
+    threads = [threading.Thread(target=robot, args=(i,)) for i in range(num_robots)]
+    mutex.started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = mutex.stats()
+    system.stop_mutexes()
+    assert shared['counter'] == num_robots * entries_per_robot
+    assert stats['violations'] == 0
+    return stats
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    for num_robots in (4, 16, 64):
+        for name, options in (('star', dict(strategy='star')), ('kary k=2', dict(strategy='kary', arity=2))):
+            stats = run(module, num_robots, 20_000 // num_robots, **options)
+            print(f"{num_robots:3d} robots  {name:9s} cs/s={stats['throughput']:8.0f}  "
+                  f"msgs/entry={stats['messages_per_entry']:5.2f}  "
+                  f"wait p50={stats['wait_p50'] * 1000:6.2f} ms  p99={stats['wait_p99'] * 1000:6.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark de ciclos adquirir/liberar sobre un árbol de Raymond de 10 a 10.000 robots:
+# búsqueda indexada (find_node en O(1)) frente al recorrido recursivo anterior del árbol.
+
+def recursive_find_node(self, robot_id):
+    """
+    Búsqueda original: recorre el árbol completo desde el nodo actual.
+    """
+    if self.robot_id == robot_id:
+        return self
+    for child in self.children:
+        result = recursive_find_node(child, robot_id)
+        if result:
+            return result
+    return None
+
+def lock_rate(module, num_robots, cycles, rng):
+    """
+    Retorna los ciclos adquirir/liberar por segundo sobre robots elegidos al azar.
+    """
+    system = module.RobotCoordinationSystem(num_robots)
+    system.send_request = lambda *args: None
+    system.send_token = lambda *args: None
+    system.init_raymond_tree('resource1')
+    robots = [rng.randrange(num_robots) for _ in range(cycles)]
+    start = time.perf_counter()
+    for robot_id in robots:
+        system.request_resource(robot_id, 'resource1')
+        system.release_resource(robot_id, 'resource1')
+    return cycles / (time.perf_counter() - start)
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    indexed_find_node = module.RaymondTree.find_node
+    for num_robots in (10, 100, 1_000, 10_000):
+        cycles = 20_000 if num_robots <= 1_000 else 2_000
+        module.RaymondTree.find_node = indexed_find_node
+        indexed = lock_rate(module, num_robots, cycles, random.Random(1))
+        module.RaymondTree.find_node = recursive_find_node
+        recursive = lock_rate(module, num_robots, cycles, random.Random(1))
+        print(f"{num_robots:6d} robots  indexed={indexed:10.0f} ops/s  "
+              f"recursive={recursive:10.0f} ops/s  speedup={indexed / recursive:6.1f}x")
+    module.RaymondTree.find_node = indexed_find_node
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Simulación de entradas a la sección crítica con distintas formas del árbol de Raymond:
+# saltos promedio del token, mensajes (solicitud + token), latencia acumulada por entrada y
+# fracción de los mensajes que atraviesa el robot más cargado (el cuello de botella).
+
+def robot_positions(num_robots, rng):
+    """
+    Ubica los robots en 4 celdas de la planta; la latencia es la distancia euclidiana.
+    """
+    cells = [(0, 0), (100, 0), (0, 100), (100, 100)]
+    positions = []
+    for i in range(num_robots):
+        cx, cy = cells[i % len(cells)]
+        positions.append((cx + rng.uniform(0, 20), cy + rng.uniform(0, 20)))
+    return [[math.dist(a, b) for b in positions] for a in positions]
+
+def skewed_requests(num_robots, count, rng):
+    """
+    Genera solicitudes con distribución tipo Zipf: pocos robots concentran la mayoría.
+    """
+    weights = [1 / (rank + 1) for rank in range(num_robots)]
+    robots = list(range(num_robots))
+    rng.shuffle(robots)
+    return rng.choices(robots, weights=weights, k=count)
+
+def simulate(root, requests, distances):
+    """
+    El token parte de la raíz y viaja hasta cada solicitante; la solicitud recorre el mismo
+    camino en sentido contrario. Retorna (saltos, mensajes, latencia) promedio por entrada y la
+    fracción de mensajes enviados o recibidos por el robot más cargado.
+    """
+    holder = root
+    hops = latency = 0
+    load = Counter()
+    for robot_id in requests:
+        path = holder.path_to(robot_id)
+        hops += len(path) - 1
+        latency += sum(distances[a][b] for a, b in zip(path, path[1:]))
+        for a, b in zip(path, path[1:]):
+            load[a] += 2
+            load[b] += 2
+        holder = root.find_node(robot_id)
+    busiest = max(load.values(), default=0) / max(1, 4 * hops)
+    return hops / len(requests), 2 * hops / len(requests), latency / len(requests), busiest
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    rng = random.Random(7)
+    num_robots = 64
+    distances = robot_positions(num_robots, rng)
+    trace = skewed_requests(num_robots, 4_000, rng)
+    warmup, requests = trace[:2_000], trace[2_000:]
+
+    system = module.RobotCoordinationSystem(num_robots)
+    system.send_request = lambda *args: None
+    system.send_token = lambda *args: None
+    system.init_raymond_tree('warmup')
+    for robot_id in warmup:  # historial de uso para las estrategias 'usage' y re-enraizado
+        system.request_resource(robot_id, 'warmup')
+    system.resource_usage['resource1'] = system.resource_usage['warmup']
+
+    layouts = [
+        ('star', dict(strategy='star')),
+        ('star + reroot', dict(strategy='star')),
+        ('kary k=2', dict(strategy='kary', arity=2)),
+        ('kary k=4', dict(strategy='kary', arity=4)),
+        ('mst', dict(strategy='mst', distances=distances)),
+        ('usage k=4', dict(strategy='usage', arity=4)),
+    ]
+    print(f"{num_robots} robots, {len(requests)} entradas")
+    for name, options in layouts:
+        root = system.init_raymond_tree('resource1', **options)
+        if name.endswith('reroot'):
+            root = system.reroot_raymond_tree('resource1')
+        hops, messages, latency, busiest = simulate(root, requests, distances)
+        print(f"{name:14s} hops={hops:5.2f}  messages={messages:5.2f}  latency={latency:7.1f}  "
+              f"busiest={busiest:6.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark del motor de instantáneas de Chandy-Lamport:
+# 1) Consistencia: transferencias de créditos entre robots con tres instantáneas solapadas; en
+#    cada una, créditos registrados + créditos en tránsito deben sumar el total.
+# 2) Costo: instantánea completa frente a incremental según cuántas claves cambiaron desde la
+#    instantánea anterior, con 50 robots x 2000 claves de estado.
+
+def check_consistency(module, num_robots, rng):
+    robots = [module.Robot(i, num_robots) for i in range(num_robots)]
+    engine = None
+
+    def on_credit(to_robot, from_robot, amount):
+        engine.set_resource(to_robot, 'credits', robots[to_robot].shared_resources['credits'] + amount)
+
+    engine = module.SnapshotEngine(robots, on_message=on_credit)
+    for robot_id in range(num_robots):
+        engine.set_resource(robot_id, 'credits', 1000)
+    total = 1000 * num_robots
+    snapshot_ids = []
+    pairs = [(a, b) for a in range(num_robots) for b in range(num_robots) if a != b]
+    for step in range(3000):
+        sender, receiver = rng.choice(pairs)
+        amount = rng.randint(1, 10)
+        engine.set_resource(sender, 'credits', robots[sender].shared_resources['credits'] - amount)
+        engine.send(sender, receiver, amount)
+        for _ in range(2):
+            engine.deliver(*rng.choice(pairs))
+        if step in (500, 520, 540):  # instantáneas solapadas desde robots distintos
+            snapshot_ids.append(engine.initiate_snapshot(rng.randrange(num_robots)))
+    engine.deliver_all()
+    for snapshot_id in snapshot_ids:
+        snapshot = engine.snapshots[snapshot_id]
+        state = engine.global_state(snapshot_id)
+        recorded = sum(resources['credits'] for resources in state.values())
+        in_flight = sum(amount for messages in snapshot.recorded_messages.values() for _, amount in messages)
+        assert snapshot.complete and recorded + in_flight == total
+        print(f"snapshot {snapshot_id}: initiator={snapshot.initiator:2d}  recorded={recorded}  "
+              f"in flight={in_flight}  total={recorded + in_flight}")
+
+def snapshot_cost(module, incremental, num_robots, num_keys, changes, rng):
+    robots = [module.Robot(i, num_robots) for i in range(num_robots)]
+    engine = module.SnapshotEngine(robots, incremental=incremental)
+    for robot in robots:
+        robot.shared_resources.update((f'k{key}', 0) for key in range(num_keys))
+    engine.initiate_snapshot(0)
+    engine.deliver_all()
+    elapsed = entries = 0
+    for round_id in range(1, 6):
+        for _ in range(changes):
+            engine.set_resource(rng.randrange(num_robots), f'k{rng.randrange(num_keys)}', round_id)
+        start = time.perf_counter()
+        snapshot_id = engine.initiate_snapshot(rng.randrange(num_robots))
+        engine.deliver_all()
+        elapsed += time.perf_counter() - start
+        entries += sum(len(recorded) for recorded in engine.snapshots[snapshot_id].recorded_resources)
+    return elapsed / 5, entries / 5
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    rng = random.Random(11)
+    check_consistency(module, 20, rng)
+    for changes in (10, 100, 1_000, 10_000):
+        full_time, full_entries = snapshot_cost(module, False, 50, 2_000, changes, rng)
+        inc_time, inc_entries = snapshot_cost(module, True, 50, 2_000, changes, rng)
+        print(f"{changes:6d} changes  full={full_time * 1000:7.2f} ms ({full_entries:8.0f} entries)  "
+              f"incremental={inc_time * 1000:7.2f} ms ({inc_entries:7.0f} entries)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from perf_utils import load_module
+
+# Benchmark de relojes vectoriales para flotas de N = 8 a 4096 robots: mezclas por segundo del
+# reloj de listas original, de la mezcla completa respaldada por array/NumPy y de la mezcla
+# diferencial (Singhal-Kshemkalyani), y bytes por mensaje de la codificación completa y diferencial.
+# En cada ronda 64 robots activos (o todos si N < 64) intercambian mensajes con pares al azar.
+
+def list_update(clock, other_clock, process_id):
+    """
+    Mezcla original: bucle interpretado sobre listas de Python.
+    """
+    for i in range(len(clock)):
+        clock[i] = max(clock[i], other_clock[i])
+    clock[process_id] += 1
+
+def bench(module, num_robots, num_messages, rng):
+    active = min(num_robots, 64)
+    robot_ids = rng.sample(range(num_robots), active)
+    clocks = {}
+    for robot_id in robot_ids:
+        clocks[robot_id] = module.VectorClock(num_robots)
+        clocks[robot_id].process_id = robot_id
+    messages = [tuple(rng.sample(robot_ids, 2)) for _ in range(num_messages)]
+
+    delta_bytes = 0
+    start = time.perf_counter()
+    for sender, receiver in messages:
+        clocks[sender].increment()
+        payload = clocks[sender].encode_for(receiver)
+        delta_bytes += len(payload)
+        clocks[receiver].merge_delta(payload)
+    delta_rate = num_messages / (time.perf_counter() - start)
+
+    snapshot = {robot_id: list(clock.clock) for robot_id, clock in clocks.items()}
+    start = time.perf_counter()
+    for sender, receiver in messages:
+        clocks[receiver].update(snapshot[sender])
+    full_rate = num_messages / (time.perf_counter() - start)
+
+    lists = {robot_id: [0] * num_robots for robot_id in robot_ids}
+    start = time.perf_counter()
+    for sender, receiver in messages:
+        list_update(lists[receiver], lists[sender], receiver)
+    list_rate = num_messages / (time.perf_counter() - start)
+    return list_rate, full_rate, delta_rate, 8 * num_robots, delta_bytes / num_messages
+
+def main():
+    module = load_module(Path(__file__).with_name('2system_task.py'), 'system_task')
+    rng = random.Random(3)
+    for num_robots in (8, 64, 256, 1024, 4096):
+        list_rate, full_rate, delta_rate, full_bytes, delta_bytes = bench(module, num_robots, 20_000, rng)
+        print(f"N={num_robots:5d}  list={list_rate:9.0f}/s  array={full_rate:9.0f}/s  delta={delta_rate:9.0f}/s  "
+              f"bytes full={full_bytes:6d}  delta={delta_bytes:7.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from output_sink import OutputSink, DISABLED
+from perf_utils import load_module
+
+# Benchmark de entrega de mensajes entre nodos: buzón por lotes (Inbox) frente a la
+# cola original (queue.Queue, un get por mensaje). Reporta mensajes/s y latencia por mensaje.
+
+class QueueInbox:
+    """
+    Buzón original: queue.Queue con un get(timeout=1) por mensaje.
+    """
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, message):
+        self._queue.put(message)
+
+    def put_many(self, messages):
+        for message in messages:
+            self._queue.put(message)
+
+    def drain(self, timeout=None):
+        try:
+            return [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+    def wake(self):
+        self._queue.put(None)
+
+def run(module, num_nodes, messages_per_node, batch_size, legacy):
+    """
+    Cada nodo recibe `messages_per_node` mensajes de un hilo emisor; retorna (mensajes/s, latencia media en us).
+    """
+    network = module.Network(num_nodes, output=OutputSink(DISABLED))
+    latencies = []
+    done = threading.Semaphore(0)
+    total = num_nodes * messages_per_node
+    for node in network.nodes:
+        if legacy:
+            node.inbox = QueueInbox()
+        remaining = [messages_per_node]
+        def handle(message, remaining=remaining):
+            if message is None:
+                return
+            latencies.append(time.perf_counter() - message.sent_at)
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.release()
+        node.handle_message = handle
+    network.start()
+    start = time.perf_counter()
+    for _ in range(0, messages_per_node, batch_size):
+        for recipient in range(num_nodes):
+            now = time.perf_counter()
+            batch = []
+            for _ in range(batch_size):
+                message = module.Message('bench', 'PING', 0)
+                message.sent_at = now
+                batch.append(message)
+            if batch_size == 1:
+                network.send(recipient, batch[0])
+            else:
+                network.send_batch(recipient, batch)
+    for _ in range(num_nodes):
+        done.acquire()
+    elapsed = time.perf_counter() - start
+    network.stop()
+    return total / elapsed, sum(latencies) / len(latencies) * 1e6
+
+def main():
+    module = load_module(Path(__file__).with_name('ejecucion_tareas.py'), 'ejecucion_tareas')
+    messages = 20_000
+    for num_nodes in (2, 8, 32, 128):
+        per_node = messages // num_nodes // 32 * 32
+        for label, batch_size, legacy in (('queue', 1, True), ('inbox', 1, False), ('inbox x32', 32, False)):
+            rate, latency = run(module, num_nodes, per_node, batch_size, legacy)
+            print(f"{num_nodes:4d} nodes  {label:<10} {rate:10.0f} msg/s  latency={latency:9.1f} us")
+
+if __name__ == '__main__':
+    main()
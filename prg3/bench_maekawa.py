@@ -0,0 +1,63 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from output_sink import OutputSink, DISABLED
+from perf_utils import load_module
+
+# Benchmark comparativo de exclusión mutua: Ricart-Agrawala (todos contra todos, con caché de
+# Roucairol-Carvalho) frente a Maekawa con cuórums de rejilla. Reporta mensajes por entrada,
+# espera media entre solicitar y entrar, y entradas por segundo.
+
+def run(module, num_nodes, contenders, entries_per_node, mutex):
+    """
+    Retorna las estadísticas de la red y las entradas por segundo; falla ante una violación o un interbloqueo.
+    """
+    network = module.Network(num_nodes, output=OutputSink(DISABLED), mutex=mutex)
+    occupancy = [0]
+    violations = [0]
+    done = threading.Semaphore(0)
+
+    def work():
+        occupancy[0] += 1
+        if occupancy[0] != 1:
+            violations[0] += 1
+        occupancy[0] -= 1
+
+    for node in network.nodes[:contenders]:
+        left = [entries_per_node]
+        def release(node=node, release_cs=node.release_cs, left=left):
+            release_cs()
+            left[0] -= 1
+            if left[0]:
+                node.request_cs(work)
+            else:
+                done.release()
+        node.release_cs = release
+    network.start()
+    start = time.perf_counter()
+    for node in network.nodes[:contenders]:
+        node.request_cs(work)
+    for _ in range(contenders):
+        assert done.acquire(timeout=120), f"{mutex}: no progress with {num_nodes} nodes (deadlock)"
+    elapsed = time.perf_counter() - start
+    network.stop()
+    assert violations[0] == 0, f"{violations[0]} mutual exclusion violations"
+    stats = network.stats()
+    stats['rate'] = stats['cs_entries'] / elapsed
+    return stats
+
+def main():
+    module = load_module(Path(__file__).with_name('ejecucion_tareas.py'), 'ejecucion_tareas')
+    for num_nodes in (9, 25, 100, 400):
+        for label, contenders in (('todos', num_nodes), ('10%', max(1, num_nodes // 10))):
+            entries = max(2, 400 // contenders)
+            for mutex in module.MUTEX_MODES:
+                stats = run(module, num_nodes, contenders, entries, mutex)
+                print(f"{num_nodes:4d} nodes  {label:<6} {mutex:<16} {stats['messages_per_entry']:7.1f} msg/entry  "
+                      f"wait={stats['mean_wait_ms']:8.2f} ms  {stats['rate']:8.0f} entries/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from output_sink import OutputSink, DISABLED
+from perf_utils import load_module
+
+# Benchmark de Ricart-Agrawala de 5 a 500 nodos: entradas a la sección crítica por segundo y
+# mensajes por entrada, con y sin la caché de respuestas de Roucairol-Carvalho.
+# "todos": cada nodo entra varias veces; "10%": solo una décima parte de los nodos compite.
+
+def run(module, num_nodes, contenders, entries_per_node, reply_caching):
+    """
+    Retorna (entradas/s, mensajes por entrada); falla si dos nodos coinciden en la sección crítica.
+    """
+    network = module.Network(num_nodes, output=OutputSink(DISABLED), reply_caching=reply_caching)
+    occupancy = [0]
+    violations = [0]
+    done = threading.Semaphore(0)
+
+    def work():
+        occupancy[0] += 1
+        if occupancy[0] != 1:
+            violations[0] += 1
+        occupancy[0] -= 1
+
+    for node in network.nodes[:contenders]:
+        left = [entries_per_node]
+        def release(node=node, release_cs=node.release_cs, left=left):
+            release_cs()
+            left[0] -= 1
+            if left[0]:
+                node.request_cs(work)
+            else:
+                done.release()
+        node.release_cs = release
+    network.start()
+    start = time.perf_counter()
+    for node in network.nodes[:contenders]:
+        node.request_cs(work)
+    for _ in range(contenders):
+        done.acquire()
+    elapsed = time.perf_counter() - start
+    network.stop()
+    assert violations[0] == 0, f"{violations[0]} mutual exclusion violations"
+    stats = network.stats()
+    return stats['cs_entries'] / elapsed, stats['messages_per_entry']
+
+def main():
+    module = load_module(Path(__file__).with_name('ejecucion_tareas.py'), 'ejecucion_tareas')
+    for num_nodes in (5, 50, 200, 500):
+        for label, contenders in (('todos', num_nodes), ('10%', max(1, num_nodes // 10))):
+            entries = max(2, 400 // contenders)
+            results = [run(module, num_nodes, contenders, entries, caching) for caching in (False, True)]
+            (plain_rate, plain_msgs), (cached_rate, cached_msgs) = results
+            print(f"{num_nodes:4d} nodes  {label:<6} RA={plain_rate:8.0f} entries/s {plain_msgs:7.1f} msg/entry  "
+                  f"RA+RC={cached_rate:8.0f} entries/s {cached_msgs:7.1f} msg/entry")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from output_sink import OutputSink, DISABLED
+from perf_utils import load_module
+
+# Benchmark de runtimes de la red de 10 a 10.000 nodos: un hilo por nodo (Network) frente a un
+# solo bucle asyncio (AsyncNetwork). Cada medición corre en un proceso nuevo y reporta la memoria
+# residente añadida, el tiempo de arranque, el de un escenario corto (10 nodos piden la sección
+# crítica con Maekawa) y el de detención.
+
+def rss_mb():
+    """
+    Memoria residente del proceso en MB (Linux).
+    """
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def measure(runtime, num_nodes):
+    module = load_module(Path(__file__).with_name('ejecucion_tareas.py'), 'ejecucion_tareas')
+    network_class = module.AsyncNetwork if runtime == module.ASYNCIO else module.Network
+    baseline = rss_mb()
+    start = time.perf_counter()
+    network = network_class(num_nodes, output=OutputSink(DISABLED), cs_time=0.001, mutex=module.MAEKAWA)
+    network.start()
+    started = time.perf_counter() - start
+    memory = rss_mb() - baseline
+    threads = threading.active_count()
+
+    start = time.perf_counter()
+    contenders = network.nodes[:10]
+    for node in contenders:
+        node.request_cs()
+    while sum(node.cs_entries for node in contenders) < len(contenders) or any(node.maekawa.request for node in contenders):
+        time.sleep(0.001)
+    scenario = time.perf_counter() - start
+
+    start = time.perf_counter()
+    network.stop()
+    stopped = time.perf_counter() - start
+    return {'memory_mb': memory, 'threads': threads, 'start_s': started, 'scenario_s': scenario, 'stop_s': stopped}
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        print(json.dumps(measure(sys.argv[2], int(sys.argv[3]))))
+        return
+    for num_nodes in (10, 100, 1_000, 10_000):
+        for runtime in ('threads', 'asyncio'):
+            output = subprocess.run([sys.executable, __file__, '--child', runtime, str(num_nodes)],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output)
+            print(f"{num_nodes:6d} nodes  {runtime:<8} memory={result['memory_mb']:8.1f} MB  "
+                  f"threads={result['threads']:6d}  start={result['start_s']:7.3f} s  "
+                  f"scenario={result['scenario_s']:7.3f} s  stop={result['stop_s']:7.3f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from output_sink import OutputSink, DISABLED
+from perf_utils import load_module
+
+# Benchmark del despliegue multiproceso (ShardedNetwork) de 1 a N procesos.
+# Carga de mensajes: en cada ronda cada nodo envía un PING a (nodo + desplazamiento) % N, así
+# que cada nodo recibe exactamente un mensaje por ronda y la mayoría cruza entre procesos.
+# Carga de exclusión mutua: 10% de los nodos entra una vez a la sección crítica con Maekawa.
+
+NUM_NODES = 1000
+ROUNDS = 200
+
+module = load_module(Path(__file__).with_name('ejecucion_tareas.py'), 'ejecucion_tareas')
+
+def ping_storm(shard):
+    """
+    Inicia las rondas de PING de los nodos locales; termina cuando cada uno recibió ROUNDS mensajes.
+    """
+    async def send_rounds():
+        for round_ in range(ROUNDS):
+            offset = 1 + round_ * 7919 % (shard.num_nodes - 1)
+            for node in shard.local_nodes:
+                node.send_message((node.node_id + offset) % shard.num_nodes, 'PING')
+            await asyncio.sleep(0)
+    asyncio.get_running_loop().create_task(send_rounds())
+    expected = ROUNDS * len(shard.local_nodes)
+    return lambda: sum(node.inbox.received for node in shard.local_nodes) >= expected
+
+def critical_sections(shard):
+    """
+    Cada nodo local con id múltiplo de 10 pide la sección crítica una vez.
+    """
+    contenders = [node for node in shard.local_nodes if node.node_id % 10 == 0]
+    for node in contenders:
+        node.request_cs()
+    return lambda: all(node.cs_entries and node.maekawa.request is None for node in contenders)
+
+def main():
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{os.cpu_count()} CPUs, {NUM_NODES} nodes")
+    for workers in worker_counts:
+        network = module.ShardedNetwork(NUM_NODES, workers, output=OutputSink(DISABLED))
+        stats = network.run(ping_storm, timeout=300)
+        assert stats['received'] == NUM_NODES * ROUNDS
+        storm_rate = stats['received'] / stats['elapsed']
+        network = module.ShardedNetwork(NUM_NODES, workers, output=OutputSink(DISABLED),
+                                        mutex=module.MAEKAWA, cs_time=0.0)
+        stats = network.run(critical_sections, timeout=300)
+        cs_rate = stats['cs_entries'] / stats['elapsed']
+        print(f"{workers:3d} workers  ping={storm_rate:10.0f} msg/s  "
+              f"maekawa={cs_rate:8.0f} entries/s  {stats['messages'] / stats['cs_entries']:6.1f} msg/entry")
+
+if __name__ == '__main__':
+    main()
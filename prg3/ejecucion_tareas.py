@@ -1,7 +1,38 @@
+import asyncio
+import bisect
+import heapq
+import math
+import multiprocessing
+import struct
+import sys
 import threading
 import time
-import queue
+import traceback
 import random
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from output_sink import OutputSink
+
+RICART_AGRAWALA = 'ricart_agrawala'  # Todos contra todos: 2(N-1) mensajes por entrada
+MAEKAWA = 'maekawa'  # Cuórums de rejilla: O(sqrt(N)) mensajes por entrada
+
+MUTEX_MODES = (RICART_AGRAWALA, MAEKAWA)
+
+THREADS = 'threads'  # Un hilo del sistema operativo por nodo
+ASYNCIO = 'asyncio'  # Un solo bucle de eventos; cada nodo es una corrutina
+
+RUNTIMES = (THREADS, ASYNCIO)
+
+# Formato binario de un Message en los anillos de memoria compartida:
+# remitente (int32), destinatario (int32), marca de tiempo (double), código de contenido (uint8), relleno a 24 bytes
+MESSAGE_RECORD = struct.Struct('<iidB7x')
+MESSAGE_CONTENTS = ('REQUEST', 'REPLY', 'RELEASE', 'LOCKED', 'FAILED', 'INQUIRE', 'YIELD', 'PING')
+CONTENT_CODES = {content: code for code, content in enumerate(MESSAGE_CONTENTS)}
 
 # Algoritmo de sincronización de relojes: BerkeleyNode
 class BerkeleyNode:
@@ -79,123 +110,523 @@ class Message:
     def __str__(self):
         return f"Message from {self.sender} at {self.timestamp}: {self.content}"
 
+# Buzón de entrada de los nodos
+class Inbox:
+    """
+    Buzón sin cerrojo en el envío: los productores anexan a un deque (append y extend son
+    atómicos) y solo despiertan al consumidor si la señal no está puesta. El consumidor
+    vacía todo lo pendiente en una sola activación.
+    """
+    def __init__(self):
+        self._items = deque()
+        self._wakeup = threading.Event()
+        self.received = 0  # Mensajes entregados al consumidor
+        self.wakeups = 0  # Activaciones del consumidor con al menos un mensaje
+
+    def put(self, message):
+        """
+        Anexa un mensaje al buzón.
+        """
+        self._items.append(message)
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def put_many(self, messages):
+        """
+        Anexa un lote de mensajes con una sola señal de despertar.
+        """
+        self._items.extend(messages)
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def drain(self, timeout=None):
+        """
+        Espera hasta `timeout` segundos a que haya mensajes y devuelve todos los pendientes.
+        """
+        if not self._items:
+            self._wakeup.wait(timeout)
+        # Se limpia la señal antes de vaciar: un mensaje anexado después deja la señal puesta
+        self._wakeup.clear()
+        batch = []
+        pop = self._items.popleft
+        try:
+            while True:
+                batch.append(pop())
+        except IndexError:
+            pass
+        if batch:
+            self.received += len(batch)
+            self.wakeups += 1
+        return batch
+
+    def wake(self):
+        """
+        Despierta al consumidor aunque no haya mensajes (p. ej. al detener el nodo).
+        """
+        self._wakeup.set()
+
+    def __len__(self):
+        return len(self._items)
+
+class AsyncInbox:
+    """
+    Buzón para el runtime asyncio: un asyncio.Queue que solo se toca desde el bucle de la red.
+    Los envíos desde otros hilos (p. ej. el hilo principal) se reprograman en el bucle.
+    """
+    def __init__(self, network):
+        self.network = network
+        self._queue = asyncio.Queue()
+        self.received = 0
+        self.wakeups = 0
+
+    def _on_loop(self):
+        return self.network.loop is None or threading.get_ident() == self.network.loop_thread
+
+    def put(self, message):
+        if self._on_loop():
+            self._queue.put_nowait(message)
+        else:
+            self.network.loop.call_soon_threadsafe(self._queue.put_nowait, message)
+
+    def put_many(self, messages):
+        if self._on_loop():
+            for message in messages:
+                self._queue.put_nowait(message)
+        else:
+            self.network.loop.call_soon_threadsafe(self.put_many, messages)
+
+    async def drain(self):
+        """
+        Espera sin bloquear el bucle a que haya mensajes y devuelve todos los pendientes.
+        """
+        batch = [await self._queue.get()]
+        get = self._queue.get_nowait
+        try:
+            while True:
+                batch.append(get())
+        except asyncio.QueueEmpty:
+            pass
+        batch = [message for message in batch if message is not None]
+        if batch:
+            self.received += len(batch)
+            self.wakeups += 1
+        return batch
+
+    def wake(self):
+        self.put(None)  # None solo despierta a la corrutina del nodo
+
+    def __len__(self):
+        return self._queue.qsize()
+
+# Exclusión mutua por cuórums: Maekawa
+def grid_quorum(node_id, num_nodes):
+    """
+    Cuórum de rejilla: la fila y la columna del nodo en una rejilla de ceil(sqrt(N)) columnas.
+    Dos cuórums cualesquiera se intersecan (si falta la celda cruzada, ambos están en la última fila).
+    """
+    width = math.ceil(math.sqrt(num_nodes))
+    row, column = divmod(node_id, width)
+    members = set(range(row * width, min((row + 1) * width, num_nodes)))
+    members.update(range(column, num_nodes, width))
+    return members
+
+class MaekawaMutex:
+    """
+    Estado de Maekawa de un nodo, como solicitante y como votante de los cuórums que lo incluyen.
+    Los interbloqueos se resuelven con INQUIRE/YIELD: un votante pregunta a quien tiene su voto
+    si lo cede cuando llega una solicitud más prioritaria, y el solicitante lo cede si ya sabe
+    (por un FAILED) que no puede entrar todavía.
+    """
+    def __init__(self, node, quorum):
+        self.node = node
+        self.quorum = frozenset(quorum)
+        # Solicitante
+        self.request = None  # (marca, nodo) de la solicitud en curso
+        self.grants = set()  # Votantes que nos dieron su voto
+        self.failed = False  # Recibimos FAILED o ya cedimos un voto en esta solicitud
+        self.inquiries = set()  # INQUIRE pendientes de contestar
+        self.in_cs = False
+        # Votante
+        self.locked_for = None  # (marca, nodo) que tiene nuestro voto
+        self.waiting = []  # Montículo de solicitudes en espera
+        self.inquired = False  # Ya enviamos INQUIRE por el voto actual
+
+    def request_cs(self, work):
+        node = self.node
+        with node.lock:
+            if self.request is not None:
+                return False
+            node.clock += 1
+            self.request = (node.clock, node.node_id)
+            timestamp = node.clock
+            self.grants = set()
+            self.failed = False
+            self.inquiries = set()
+            node.cs_work = work
+            node.requested_at = time.perf_counter()
+            actions = [(member, 'REQUEST') for member in sorted(self.quorum)]
+            self._count(actions)
+        self._send(actions, timestamp)
+        return True
+
+    def release_cs(self):
+        node = self.node
+        with node.lock:
+            node.clock += 1
+            self.request = None
+            self.in_cs = False
+            actions = [(member, 'RELEASE') for member in sorted(self.quorum)]
+            self._count(actions)
+        self._send(actions)
+
+    def handle(self, message):
+        """
+        Procesa un mensaje de Maekawa; se llama desde el hilo despachador del nodo.
+        """
+        handler = getattr(self, '_on_' + message.content.lower(), None)
+        if handler is None:
+            return
+        with self.node.lock:
+            actions, enter = handler(message)
+            self._count(actions)
+        self._send(actions)
+        if enter:
+            self.node.enter_cs()
+
+    # Votante
+    def _grant_next(self):
+        self.inquired = False
+        if not self.waiting:
+            self.locked_for = None
+            return []
+        self.locked_for = heapq.heappop(self.waiting)
+        return [(self.locked_for[1], 'LOCKED')]
+
+    def _on_request(self, message):
+        request = (message.timestamp, message.sender)
+        if self.locked_for is None:
+            self.locked_for = request
+            return [(message.sender, 'LOCKED')], False
+        beaten = (self.waiting and self.waiting[0] < request) or self.locked_for < request
+        # La cabeza anterior de la cola nunca recibió FAILED: si la desplazamos, debe saberlo
+        # para ceder los votos que tenga; si no, puede retenerlos para siempre (interbloqueo)
+        displaced = self.waiting[0] if self.waiting and not beaten else None
+        heapq.heappush(self.waiting, request)
+        if beaten:
+            return [(message.sender, 'FAILED')], False
+        actions = [] if displaced is None else [(displaced[1], 'FAILED')]
+        if not self.inquired:
+            self.inquired = True
+            actions.append((self.locked_for[1], 'INQUIRE'))
+        return actions, False
+
+    def _on_yield(self, message):
+        if self.locked_for is None or self.locked_for[1] != message.sender:
+            return [], False
+        heapq.heappush(self.waiting, self.locked_for)
+        return self._grant_next(), False
+
+    def _on_release(self, message):
+        if self.locked_for is None or self.locked_for[1] != message.sender:
+            return [], False
+        return self._grant_next(), False
+
+    # Solicitante
+    def _on_locked(self, message):
+        if self.request is None:
+            return [], False
+        self.grants.add(message.sender)
+        self.inquiries.discard(message.sender)
+        enter = not self.in_cs and self.grants == self.quorum
+        if enter:
+            self.in_cs = True
+            self.inquiries.clear()  # Se liberarán con RELEASE al salir
+        return [], enter
+
+    def _on_failed(self, message):
+        if self.request is None or self.in_cs:
+            return [], False
+        self.failed = True
+        return self._yield_to(self.inquiries), False
+
+    def _on_inquire(self, message):
+        # Un INQUIRE de un votante cuyo voto ya no tenemos es obsoleto
+        if self.request is None or self.in_cs or message.sender not in self.grants:
+            return [], False
+        if self.failed:
+            return self._yield_to({message.sender}), False
+        self.inquiries.add(message.sender)
+        return [], False
+
+    def _yield_to(self, voters):
+        voters = sorted(voters)
+        self.grants.difference_update(voters)
+        self.inquiries.difference_update(voters)
+        if voters:
+            self.failed = True
+        return [(voter, 'YIELD') for voter in voters]
+
+    def _count(self, actions):
+        self.node.messages_sent += sum(1 for recipient, _ in actions if recipient != self.node.node_id)
+
+    def _send(self, actions, timestamp=None):
+        for recipient, content in actions:
+            # REQUEST lleva la marca de la solicitud; el resto, el reloj actual
+            self.node.send_message(recipient, content, timestamp if content == 'REQUEST' else None)
+
 # Clase Node
 class Node:
     def __init__(self, node_id, total_nodes, network):
         self.node_id = node_id
         self.total_nodes = total_nodes
         self.network = network
-        self.queue = queue.Queue()
+        self.inbox = Inbox()
         self.clock = random.randint(0, 10)  # Inicialización aleatoria para demostrar sincronización
         self.lock = threading.Lock()
         self.requesting_cs = False
-        self.replies_received = 0
+        self.in_cs = False
+        self.request_timestamp = None  # Marca (reloj de Lamport) de la solicitud en curso
+        self.pending_replies = set()  # Nodos cuya respuesta falta para entrar
+        self.deferred = set()  # Nodos a los que se responderá al liberar la sección crítica
+        self.authorized = set()  # Roucairol-Carvalho: permisos vigentes que no hace falta volver a pedir
+        self.cs_work = None
+        self.cs_entries = 0
+        self.messages_sent = 0
+        self.requested_at = None
+        self.cs_wait = 0.0  # Tiempo total entre solicitar y entrar a la sección crítica
+        self.maekawa = None
+        if network.mutex == MAEKAWA:
+            self.maekawa = MaekawaMutex(self, grid_quorum(node_id, total_nodes))
         self.active = True
         self.garbage_collector = CheneyCollector(10)
         self.berkeley_node = BerkeleyNode(node_id, self.clock)
 
-    def send_message(self, recipient, content):
+    def send_message(self, recipient, content, timestamp=None):
         """
         Envía un mensaje a otro nodo en la red.
         """
-        timestamp = self.clock
+        if timestamp is None:
+            timestamp = self.clock
         message = Message(self.node_id, content, timestamp)
         self.network.send(recipient, message)
 
+    def send_messages(self, recipient, contents):
+        """
+        Envía varios mensajes a un mismo nodo como un solo lote.
+        """
+        timestamp = self.clock
+        messages = [Message(self.node_id, content, timestamp) for content in contents]
+        self.network.send_batch(recipient, messages)
+
+    def tick(self):
+        """
+        Avanza el reloj lógico por un evento local y devuelve el nuevo valor.
+        """
+        with self.lock:
+            self.clock += 1
+            return self.clock
+
     def receive_message(self, message):
         """
         Recibe un mensaje de otro nodo y actualiza el reloj lógico.
         """
-        self.clock = max(self.clock, message.timestamp) + 1
-        self.queue.put(message)
+        with self.lock:
+            self.clock = max(self.clock, message.timestamp) + 1
+        self.inbox.put(message)
 
-    def request_cs(self):
+    def receive_messages(self, messages):
+        """
+        Recibe un lote de mensajes; el reloj se actualiza una vez con la marca mayor del lote.
         """
-        Solicita acceso a la sección crítica (Critical Section).
+        if not messages:
+            return
+        latest = max(message.timestamp for message in messages)
+        with self.lock:
+            self.clock = max(self.clock, latest) + 1
+        self.inbox.put_many(messages)
+
+    def request_cs(self, work=None):
         """
-        self.clock += 1
-        self.requesting_cs = True
-        self.replies_received = 0
-        for node in range(self.total_nodes):
-            if node != self.node_id:
-                self.send_message(node, 'REQUEST')
+        Solicita acceso a la sección crítica (Critical Section) con Ricart-Agrawala.
+        Con la optimización de Roucairol-Carvalho solo se pide permiso a los nodos que
+        lo solicitaron desde la última entrada; `work` se ejecuta dentro de la sección crítica.
+        En modo Maekawa la solicitud se delega al cuórum del nodo.
+        """
+        if self.maekawa is not None:
+            return self.maekawa.request_cs(work)
+        with self.lock:
+            if self.requesting_cs:
+                return False
+            self.clock += 1
+            self.requesting_cs = True
+            self.request_timestamp = timestamp = self.clock
+            self.cs_work = work
+            self.requested_at = time.perf_counter()
+            if not self.network.reply_caching:
+                self.authorized.clear()
+            others = set(range(self.total_nodes))
+            others.discard(self.node_id)
+            self.pending_replies = others - self.authorized
+            targets = sorted(self.pending_replies)
+            self.messages_sent += len(targets)
+            enter = not targets
+            if enter:
+                self.in_cs = True
+        for node in targets:
+            self.send_message(node, 'REQUEST', timestamp)
+        if enter:
+            self.enter_cs()
+        return True
 
     def release_cs(self):
         """
-        Libera la sección crítica y notifica a otros nodos.
+        Libera la sección crítica y responde a las solicitudes diferidas.
         """
-        self.clock += 1
-        self.requesting_cs = False
-        for node in range(self.total_nodes):
-            if node != self.node_id:
-                self.send_message(node, 'RELEASE')
+        if self.maekawa is not None:
+            self.maekawa.release_cs()
+            return
+        with self.lock:
+            self.clock += 1
+            self.in_cs = False
+            self.requesting_cs = False
+            self.request_timestamp = None
+            deferred, self.deferred = sorted(self.deferred), set()
+            self.authorized.difference_update(deferred)
+            self.messages_sent += len(deferred)
+        for node in deferred:
+            self.send_message(node, 'REPLY')
 
     def handle_request(self, message):
         """
-        Maneja una solicitud de acceso a la sección crítica.
+        Maneja una solicitud de acceso a la sección crítica: responde de inmediato o la
+        difiere hasta `release_cs` si la solicitud propia tiene prioridad.
         """
-        if not self.requesting_cs or (self.requesting_cs and (self.clock, self.node_id) < (message.timestamp, message.sender)):
-            self.send_message(message.sender, 'REPLY')
-        else:
-            self.queue.put(message)
+        sender = message.sender
+        with self.lock:
+            ours_first = self.requesting_cs and (self.request_timestamp, self.node_id) < (message.timestamp, sender)
+            if self.in_cs or ours_first:
+                self.deferred.add(sender)
+                return
+            # El permiso que teníamos de `sender` deja de valer; si seguimos esperando, hay que volver a pedirlo
+            re_request = self.requesting_cs and sender in self.authorized
+            timestamp = self.request_timestamp
+            self.authorized.discard(sender)
+            if re_request:
+                self.pending_replies.add(sender)
+            self.messages_sent += 2 if re_request else 1
+        self.send_message(sender, 'REPLY')
+        if re_request:
+            self.send_message(sender, 'REQUEST', timestamp)
 
     def handle_release(self, message):
         """
-        Maneja la liberación de la sección crítica (actualmente sin implementar).
+        Ricart-Agrawala no usa RELEASE: las respuestas diferidas cumplen ese papel.
+        Se ignora por compatibilidad con nodos que aún lo envían.
         """
         pass
 
-    def handle_reply(self):
+    def handle_reply(self, message):
         """
         Maneja una respuesta a la solicitud de acceso a la sección crítica.
         """
-        self.replies_received += 1
-        if self.replies_received == self.total_nodes - 1:
+        with self.lock:
+            self.authorized.add(message.sender)
+            self.pending_replies.discard(message.sender)
+            enter = self.requesting_cs and not self.in_cs and not self.pending_replies
+            if enter:
+                self.in_cs = True
+        if enter:
             self.enter_cs()
 
     def enter_cs(self):
         """
-        Entra en la sección crítica y simula trabajo.
+        Entra en la sección crítica; el trabajo corre en el ejecutor de la red para no
+        bloquear al hilo que despacha los mensajes.
         """
-        print(f"Node {self.node_id} entering critical section at clock {self.clock}.")
-        time.sleep(1)  # Simulate work
-        print(f"Node {self.node_id} leaving critical section at clock {self.clock}.")
-        self.release_cs()
+        self.cs_entries += 1
+        self.cs_wait += time.perf_counter() - self.requested_at
+        self.network.run_cs(self)
+
+    def _run_cs(self):
+        self.network.output.info("Node %s entering critical section at clock %s.", self.node_id, self.clock)
+        try:
+            if self.cs_work is not None:
+                self.cs_work()
+            else:
+                time.sleep(self.network.cs_time)  # Simulate work
+        finally:
+            self.network.output.info("Node %s leaving critical section at clock %s.", self.node_id, self.clock)
+            self.release_cs()
+
+    async def _run_cs_async(self):
+        self.network.output.info("Node %s entering critical section at clock %s.", self.node_id, self.clock)
+        try:
+            if self.cs_work is None:
+                await asyncio.sleep(self.network.cs_time)  # Simulate work
+            elif asyncio.iscoroutinefunction(self.cs_work):
+                await self.cs_work()
+            else:
+                # Un trabajo síncrono podría bloquear el bucle: se ejecuta en el ejecutor de la red
+                await asyncio.get_running_loop().run_in_executor(self.network.cs_executor, self.cs_work)
+        finally:
+            self.network.output.info("Node %s leaving critical section at clock %s.", self.node_id, self.clock)
+            self.release_cs()
 
     def perform_garbage_collection(self):
         """
         Realiza la recolección de basura usando el algoritmo de Cheney.
         """
-        print(f"Node {self.node_id} performing garbage collection.")
+        self.network.output.info("Node %s performing garbage collection.", self.node_id)
         self.garbage_collector.collect()
-        print(f"Node {self.node_id} garbage collection complete.")
+        self.network.output.info("Node %s garbage collection complete.", self.node_id)
 
     def run(self):
         """
         Ejecuta el bucle principal del nodo, manejando mensajes recibidos.
         """
         while self.active:
-            try:
-                message = self.queue.get(timeout=1)
-                if message.content == 'REQUEST':
-                    self.handle_request(message)
-                elif message.content == 'RELEASE':
-                    self.handle_release(message)
-                elif message.content == 'REPLY':
-                    self.handle_reply()
-            except queue.Empty:
-                continue
+            for message in self.inbox.drain(timeout=1):
+                self.handle_message(message)
+
+    async def run_async(self):
+        """
+        Versión corrutina de `run` para el runtime asyncio.
+        """
+        while self.active:
+            for message in await self.inbox.drain():
+                self.handle_message(message)
+
+    def handle_message(self, message):
+        """
+        Despacha un mensaje recibido según su contenido.
+        """
+        if self.maekawa is not None:
+            self.maekawa.handle(message)
+        elif message.content == 'REQUEST':
+            self.handle_request(message)
+        elif message.content == 'RELEASE':
+            self.handle_release(message)
+        elif message.content == 'REPLY':
+            self.handle_reply(message)
 
     def stop(self):
         """
         Detiene la ejecución del nodo.
         """
         self.active = False
+        self.inbox.wake()
 
 # Clase Network
 class Network:
-    def __init__(self, num_nodes):
+    def __init__(self, num_nodes, output=None, cs_time=1.0, reply_caching=True, mutex=RICART_AGRAWALA):
+        if mutex not in MUTEX_MODES:
+            raise ValueError(f'Unknown mutual exclusion mode: {mutex}')
         self.num_nodes = num_nodes
+        self.mutex = mutex  # Algoritmo de exclusión mutua de los nodos
+        self.output = output or OutputSink(use_logging=False)  # Destino de la salida de los nodos
+        self.cs_time = cs_time  # Duración del trabajo simulado en la sección crítica
+        self.reply_caching = reply_caching  # Optimización de Roucairol-Carvalho
+        self.cs_executor = ThreadPoolExecutor(thread_name_prefix='critical-section')
         self.nodes = [Node(node_id, num_nodes, self) for node_id in range(num_nodes)]
         self.threads = []
 
@@ -205,6 +636,12 @@ class Network:
         """
         self.nodes[recipient].receive_message(message)
 
+    def send_batch(self, recipient, messages):
+        """
+        Envía un lote de mensajes a un nodo específico en la red.
+        """
+        self.nodes[recipient].receive_messages(messages)
+
     def start(self):
         """
         Inicia la ejecución de todos los nodos en la red.
@@ -222,20 +659,409 @@ class Network:
             node.stop()
         for thread in self.threads:
             thread.join()
+        self.cs_executor.shutdown(wait=True)
+
+    def run_cs(self, node):
+        """
+        Ejecuta la sección crítica de un nodo fuera de su hilo despachador.
+        """
+        self.cs_executor.submit(node._run_cs)
+
+    def stats(self):
+        """
+        Entradas a la sección crítica, mensajes de exclusión mutua enviados por todos los nodos y
+        espera media entre solicitar y entrar.
+        """
+        entries = sum(node.cs_entries for node in self.nodes)
+        messages = sum(node.messages_sent for node in self.nodes)
+        wait = sum(node.cs_wait for node in self.nodes)
+        return {
+            'cs_entries': entries,
+            'messages': messages,
+            'messages_per_entry': messages / entries if entries else 0.0,
+            'mean_wait_ms': wait / entries * 1000 if entries else 0.0,
+        }
+
+class AsyncNetwork(Network):
+    """
+    Runtime asyncio: un solo hilo con un bucle de eventos aloja a todos los nodos como corrutinas
+    con buzones asyncio.Queue. La interfaz es la misma que la de Network, así que el resto del
+    programa puede seguir llamando a los nodos desde el hilo principal.
+    """
+    def __init__(self, num_nodes, output=None, **kwargs):
+        self.loop = None
+        self.loop_thread = None
+        self._cs_tasks = set()
+        super().__init__(num_nodes, output, **kwargs)
+        for node in self.nodes:
+            node.inbox = AsyncInbox(self)
+
+    def start(self):
+        """
+        Arranca el bucle de eventos en un hilo propio y espera a que todos los nodos estén corriendo.
+        """
+        ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=self._serve, args=(ready,), name='network-loop')
+        thread.start()
+        self.threads.append(thread)
+        ready.wait()
+
+    def _serve(self, ready):
+        self.loop_thread = threading.get_ident()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._main(ready))
+        finally:
+            self.loop.close()
+
+    async def _main(self, ready):
+        tasks = [asyncio.create_task(node.run_async()) for node in self.nodes]
+        ready.set()
+        await asyncio.gather(*tasks)
+        # Las secciones críticas en curso terminan antes de cerrar el bucle
+        while self._cs_tasks:
+            await asyncio.gather(*self._cs_tasks)
+
+    def run_cs(self, node):
+        """
+        Programa la sección crítica del nodo como tarea del bucle.
+        """
+        if threading.get_ident() == self.loop_thread:
+            self._spawn_cs(node)
+        else:
+            self.loop.call_soon_threadsafe(self._spawn_cs, node)
+
+    def _spawn_cs(self, node):
+        task = asyncio.create_task(node._run_cs_async())
+        self._cs_tasks.add(task)
+        task.add_done_callback(self._cs_tasks.discard)
+
+# Despliegue multiproceso: anillos de mensajes en memoria compartida
+class MessageRing:
+    """
+    Anillo de un solo productor y un solo consumidor en multiprocessing.shared_memory.
+    Disposición: capacidad en el byte 0, `head` (lo escribe el consumidor) en el 64, `tail` (lo
+    escribe el productor) en el 128 y registros MESSAGE_RECORD desde el 192. Cada contador está en
+    su propia línea de caché y solo lo escribe un lado; se publica después de escribir los registros.
+    Los contadores se leen y escriben como enteros alineados de 8 bytes (una sola instrucción):
+    struct.pack_into los escribe byte a byte y el otro proceso podía leer un valor a medias.
+    """
+    HEAD = 64
+    TAIL = 128
+    DATA = 192
+
+    def __init__(self, capacity=4096, name=None):
+        if name is None:
+            size = self.DATA + capacity * MESSAGE_RECORD.size
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._counters = self.shm.buf[:self.DATA].cast('Q')
+        if name is None:
+            self._counters[0] = capacity
+        self.capacity = self._counters[0]
+
+    def __getstate__(self):
+        return self.shm.name
+
+    def __setstate__(self, name):
+        self.__init__(name=name)
+
+    def __len__(self):
+        counters = self._counters
+        return counters[self.TAIL // 8] - counters[self.HEAD // 8]
+
+    def push_many(self, records):
+        """
+        Escribe los registros (remitente, destinatario, marca, código) que quepan; retorna cuántos escribió.
+        """
+        buf, counters = self.shm.buf, self._counters
+        head = counters[self.HEAD // 8]
+        tail = counters[self.TAIL // 8]
+        count = min(len(records), self.capacity - (tail - head))
+        pack, size, capacity = MESSAGE_RECORD.pack_into, MESSAGE_RECORD.size, self.capacity
+        for i in range(count):
+            pack(buf, self.DATA + (tail + i) % capacity * size, *records[i])
+        if count:
+            counters[self.TAIL // 8] = tail + count
+        return count
+
+    def pop_many(self):
+        """
+        Lee y retira todos los registros publicados.
+        """
+        buf, counters = self.shm.buf, self._counters
+        head = counters[self.HEAD // 8]
+        tail = counters[self.TAIL // 8]
+        if head == tail:
+            return []
+        unpack, size, capacity = MESSAGE_RECORD.unpack_from, MESSAGE_RECORD.size, self.capacity
+        records = [unpack(buf, self.DATA + position % capacity * size) for position in range(head, tail)]
+        counters[self.HEAD // 8] = tail
+        return records
+
+    def close(self):
+        self._counters.release()  # La vista exportada impide cerrar el segmento
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+def shard_bounds(num_nodes, num_workers):
+    """
+    Límites de las particiones contiguas de nodos: el proceso i aloja [bounds[i], bounds[i + 1]).
+    """
+    return [worker * num_nodes // num_workers for worker in range(num_workers + 1)]
+
+class ShardNetwork(AsyncNetwork):
+    """
+    Partición de la red dentro de un proceso trabajador. Los mensajes entre nodos locales siguen
+    siendo llamadas directas; los dirigidos a otra partición se acumulan por destino y se escriben
+    en el anillo correspondiente. Todo corre en el bucle del proceso, que es el único productor de
+    sus anillos de salida y el único consumidor de los de entrada.
+    """
+    def __init__(self, shard_id, num_nodes, num_workers, rings_out, rings_in, output=None, **kwargs):
+        super().__init__(0, output, **kwargs)
+        self.num_nodes = num_nodes
+        self.shard_id = shard_id
+        self.bounds = shard_bounds(num_nodes, num_workers)
+        self.rings_out = rings_out  # partición destino -> MessageRing
+        self.rings_in = rings_in
+        self._outbox = {shard: [] for shard in rings_out}
+        self._outgoing = None
+        first, last = self.bounds[shard_id], self.bounds[shard_id + 1]
+        self.nodes = [None] * num_nodes
+        for node_id in range(first, last):
+            node = Node(node_id, num_nodes, self)
+            node.inbox = AsyncInbox(self)
+            self.nodes[node_id] = node
+        self.local_nodes = self.nodes[first:last]
+
+    def shard_of(self, node_id):
+        return bisect.bisect_right(self.bounds, node_id) - 1
+
+    def send(self, recipient, message):
+        """
+        Entrega directa a un nodo local o encola el registro binario hacia otra partición.
+        """
+        node = self.nodes[recipient]
+        if node is not None:
+            node.receive_message(message)
+            return
+        outbox = self._outbox[self.shard_of(recipient)]
+        if not outbox:
+            self._outgoing.set()
+        outbox.append((message.sender, recipient, message.timestamp, CONTENT_CODES[message.content]))
+
+    def send_batch(self, recipient, messages):
+        node = self.nodes[recipient]
+        if node is not None:
+            node.receive_messages(messages)
+            return
+        for message in messages:
+            self.send(recipient, message)
+
+    def _flush(self):
+        moved = 0
+        for shard, records in self._outbox.items():
+            if records:
+                written = self.rings_out[shard].push_many(records)
+                del records[:written]
+                moved += written
+        return moved
+
+    def _poll(self):
+        moved = 0
+        nodes = self.nodes
+        for ring in self.rings_in:
+            for sender, recipient, timestamp, code in ring.pop_many():
+                nodes[recipient].receive_message(Message(sender, MESSAGE_CONTENTS[code], timestamp))
+                moved += 1
+        return moved
+
+    async def serve(self, task, done, stop):
+        """
+        Corre los nodos locales y mueve mensajes entre anillos hasta que el padre pida detenerse.
+        `task(shard)` inicia la carga y retorna una función que indica si la parte local terminó.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self._outgoing = asyncio.Event()
+        tasks = [asyncio.create_task(node.run_async()) for node in self.local_nodes]
+        finished = task(self)
+        idle = 0.0
+        while not stop.is_set():
+            self._outgoing.clear()
+            moved = self._flush() + self._poll()
+            if finished is not None and finished():
+                done.set()
+                finished = None
+            if moved:
+                idle = 0.0
+                await asyncio.sleep(0)
+                continue
+            # Sin tráfico: espera con retroceso exponencial o hasta que haya algo que enviar
+            idle = min(idle * 2 or 1e-5, 1e-3)
+            try:
+                await asyncio.wait_for(self._outgoing.wait(), idle)
+            except asyncio.TimeoutError:
+                pass
+        for node in self.local_nodes:
+            node.stop()
+        await asyncio.gather(*tasks)
+        while self._cs_tasks:
+            await asyncio.gather(*self._cs_tasks)
+
+    def stats(self):
+        entries = sum(node.cs_entries for node in self.local_nodes)
+        return {
+            'cs_entries': entries,
+            'messages': sum(node.messages_sent for node in self.local_nodes),
+            'received': sum(node.inbox.received for node in self.local_nodes),
+            'cs_wait': sum(node.cs_wait for node in self.local_nodes),
+        }
+
+def _serve_shard(shard_id, num_nodes, num_workers, rings_out, rings_in, kwargs, task, barrier, done, stop, results):
+    """
+    Cuerpo de un proceso trabajador. Cualquier excepción se devuelve al padre por `results`
+    (y rompe la barrera si aún no se cruzó) en vez de dejarlo esperando.
+    """
+    network = None
+    try:
+        network = ShardNetwork(shard_id, num_nodes, num_workers, rings_out, rings_in, **kwargs)
+        barrier.wait()
+        asyncio.run(network.serve(task, done, stop))
+        results.put((shard_id, network.stats(), None))
+    except BaseException:
+        barrier.abort()
+        results.put((shard_id, None, traceback.format_exc()))
+    finally:
+        if network is not None:
+            network.cs_executor.shutdown(wait=True)
+        for ring in list(rings_out.values()) + list(rings_in):
+            ring.close()
+
+class ShardedNetwork:
+    """
+    Despliegue multiproceso: reparte los nodos en `num_workers` procesos, cada uno con una
+    ShardNetwork. Cada par ordenado de procesos tiene su propio anillo (un productor, un consumidor).
+    """
+    def __init__(self, num_nodes, num_workers, ring_capacity=4096, output=None, start_timeout=60.0, **kwargs):
+        if not 1 <= num_workers <= num_nodes:
+            raise ValueError(f'num_workers must be between 1 and {num_nodes}')
+        self.num_nodes = num_nodes
+        self.num_workers = num_workers
+        self.ring_capacity = ring_capacity
+        self.start_timeout = start_timeout  # Espera máxima al arranque de los procesos y a sus resultados
+        self.kwargs = dict(kwargs, output=output or OutputSink(use_logging=False))
+
+    def run(self, task, timeout=None):
+        """
+        Ejecuta `task` en todas las particiones y espera a que todas terminen su parte.
+        Retorna las estadísticas sumadas y el tiempo transcurrido desde que todos los procesos están listos.
+        Lanza RuntimeError con el traceback si un trabajador falla o muere, y TimeoutError si
+        la carga no termina en `timeout` segundos.
+        """
+        workers = range(self.num_workers)
+        rings = {(src, dst): MessageRing(self.ring_capacity) for src in workers for dst in workers if src != dst}
+        barrier = multiprocessing.Barrier(self.num_workers + 1)
+        stop = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        dones = [multiprocessing.Event() for _ in workers]
+        processes = []
+        collected = {}
+        try:
+            for shard in workers:
+                rings_out = {dst: rings[shard, dst] for dst in workers if dst != shard}
+                rings_in = [rings[src, shard] for src in workers if src != shard]
+                process = multiprocessing.Process(
+                    target=_serve_shard, name=f'shard-{shard}',
+                    args=(shard, self.num_nodes, self.num_workers, rings_out, rings_in, self.kwargs,
+                          task, barrier, dones[shard], stop, results))
+                process.start()
+                processes.append(process)
+            try:
+                barrier.wait(self.start_timeout)
+            except threading.BrokenBarrierError:
+                self._collect(results, collected, processes, wait=1.0)
+                raise TimeoutError(f'sharded network workers did not start within {self.start_timeout}s')
+            start = time.perf_counter()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            pending = set(workers)
+            while pending:
+                pending = {shard for shard in pending if not dones[shard].is_set()}
+                if not pending:
+                    break
+                self._collect(results, collected, processes)
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError('sharded network did not finish in time')
+                dones[min(pending)].wait(0.05)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            deadline = time.monotonic() + self.start_timeout
+            while len(collected) < self.num_workers:
+                if time.monotonic() > deadline:
+                    raise TimeoutError('sharded network workers did not report their stats')
+                self._collect(results, collected, processes, wait=0.05)
+            totals = {'elapsed': elapsed}
+            for stats in collected.values():
+                for key, value in stats.items():
+                    totals[key] = totals.get(key, 0) + value
+            return totals
+        finally:
+            stop.set()
+            for process in processes:
+                process.join(self.start_timeout)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            for ring in rings.values():
+                ring.close()
+                ring.unlink()
+
+    @staticmethod
+    def _collect(results, collected, processes, wait=0.0):
+        """
+        Recoge los resultados disponibles; lanza RuntimeError si un trabajador reportó una excepción
+        o terminó sin reportar nada.
+        """
+        while True:
+            try:
+                shard, stats, error = results.get(timeout=wait) if wait else results.get_nowait()
+            except queue.Empty:
+                break
+            if error is not None:
+                raise RuntimeError(f'shard {shard} failed:\n{error}')
+            collected[shard] = stats
+            wait = 0.0
+        for shard, process in enumerate(processes):
+            if shard not in collected and not process.is_alive():
+                # Un trabajador que terminó pudo dejar su resultado en la cola justo ahora
+                try:
+                    shard_, stats, error = results.get(timeout=0.5)
+                except queue.Empty:
+                    raise RuntimeError(f'shard {shard} exited with code {process.exitcode} without reporting')
+                if error is not None:
+                    raise RuntimeError(f'shard {shard_} failed:\n{error}')
+                collected[shard_] = stats
 
 # Simulación de tareas científicas
-def simulate_scientific_tasks():
+def simulate_scientific_tasks(mutex=RICART_AGRAWALA, runtime=THREADS):
     """
     Simula un conjunto de tareas científicas en una red de nodos.
     """
+    if runtime not in RUNTIMES:
+        raise ValueError(f'Unknown runtime: {runtime}')
     num_nodes = 5
-    network = Network(num_nodes)
+    network_class = AsyncNetwork if runtime == ASYNCIO else Network
+    network = network_class(num_nodes, mutex=mutex)
     network.start()
 
     # Sincronización de relojes usando el algoritmo de Berkeley
     berkeley_master = BerkeleyMaster([node.berkeley_node for node in network.nodes])
     new_times = berkeley_master.synchronize_clocks()
-    print("Synchronized times:", new_times)
+    network.output.info("Synchronized times: %s", new_times)
     for node_id, new_time in new_times:
         network.nodes[node_id].clock = new_time
 